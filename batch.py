@@ -0,0 +1,43 @@
+from src.park_accessibility.NA_park_accessibility.NA_batch import run_batch, download_municipalities
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Network park accessibility for many municipalities and thresholds (resumable)."
+    )
+    parser.add_argument("municipalities", nargs="*", help='PDOK municipality names, e.g. Amsterdam Utrecht "Den Haag"')
+    parser.add_argument("--file", help="Text file with one municipality per line")
+    parser.add_argument("--all", action="store_true", help="Every municipality in the PDOK boundaries")
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[1500], help="Walking distances in meters")
+    parser.add_argument("--out", default="outputs/NA_batch", help="Output root; one directory per municipality")
+    parser.add_argument("--crs", default="EPSG:28992")
+    parser.add_argument("--worker-mem-gb", type=float, default=4.0, help="Expected peak memory per city worker")
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    municipalities = list(args.municipalities)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            municipalities += [line.strip() for line in f if line.strip()]
+    if args.all:
+        import geopandas as gpd
+        municipalities += sorted(gpd.read_file(download_municipalities(args.out))["naam"].unique())
+    municipalities = list(dict.fromkeys(municipalities))
+    if not municipalities:
+        parser.error("no municipalities given")
+
+    summary = run_batch(
+        municipalities,
+        thresholds=args.thresholds,
+        out_root=args.out,
+        target_crs=args.crs,
+        worker_mem_gb=args.worker_mem_gb,
+        max_workers=args.max_workers
+    )
+    failed = [r for r in summary if r["status"] != "done"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
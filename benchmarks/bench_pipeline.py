@@ -0,0 +1,214 @@
+"""
+Offline benchmark suite for the accessibility pipeline hot paths.
+
+Everything runs on a deterministic SyntheticCity, so no network is needed.
+Each benchmark gets one untimed warm-up run (imports, caches, first-call
+allocation) and is then repeated; the median and minimum wall times are
+reported. Results can be saved as a JSON baseline and later checked
+against it:
+
+    python benchmarks/bench_pipeline.py --size small --save-baseline
+    python benchmarks/bench_pipeline.py --size small --check
+
+--check compares the minimum of the runs, which is far less noisy than
+the median, and exits with status 1 when a benchmark is slower than
+baseline * (1 + tolerance) and by more than --min-delta seconds.
+Baselines are machine specific, so they are not committed: save one
+locally (benchmarks/baselines/ is git-ignored) before changing code.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# (nodes, buildings, parks)
+SIZES = {
+    "small": (2_500, 5_000, 25),
+    "medium": (20_000, 50_000, 150),
+    "large": (100_000, 250_000, 600),
+}
+
+
+def _timeit(fn, repeat, warmup=1):
+    times = []
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        times.append(time.perf_counter() - t0)
+    return times, result
+
+
+def run_benchmarks(size="small", repeat=5, seed=0):
+    import networkx as nx
+    import numpy as np
+
+    from park_accessibility.synthetic_city import SyntheticCity
+    from park_accessibility.NA_park_accessibility.NA_analysis import ParkAccessibility
+    from park_accessibility.NA_park_accessibility.NA_map_layers import MapLayerPreprocessor
+    from park_accessibility.NA_park_accessibility.NA_visualization import FoliumVisualization
+    from park_accessibility.kd_park_accessibility.kdtree import build_park_kdtree, nearest_park
+
+    n_nodes, n_buildings, n_parks = SIZES[size]
+    city = SyntheticCity(n_nodes=n_nodes, n_buildings=n_buildings, n_parks=n_parks, seed=seed)
+    model = ParkAccessibility(graph=city.graph)
+    results = {}
+
+    def record(name, times):
+        results[name] = {
+            "median_s": statistics.median(times),
+            "min_s": min(times),
+            "max_s": max(times),
+            "repeat": len(times),
+        }
+        print(f"  {name:<24} median {results[name]['median_s']:.4f} s  min {results[name]['min_s']:.4f} s")
+
+    # -----------------------------------
+    # Network analysis
+    # -----------------------------------
+    times, (buildings_pts, park_nodes) = _timeit(
+        lambda: model.generate_building_centroids_and_snap(city.buildings, city.parks), repeat
+    )
+    record("snap", times)
+
+    times, distances = _timeit(
+        lambda: nx.multi_source_dijkstra_path_length(model.G, park_nodes, cutoff=1500, weight="length"),
+        repeat
+    )
+    record("dijkstra", times)
+
+    times, _ = _timeit(lambda: buildings_pts["nearest_node"].map(distances), repeat)
+    record("distance_join", times)
+
+    times, accessibility_gdf = _timeit(
+        lambda: model.compute_accessibility(buildings_pts, park_nodes, max_distance=1500), repeat
+    )
+    record("compute_accessibility", times)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        times, _ = _timeit(
+            lambda: FoliumVisualization.plot_map(
+                buildings_gdf=accessibility_gdf,
+                street_gdf=city.edges,
+                park_gdf=city.parks,
+                ams_boundary=city.boundary,
+                layer_preprocessor=MapLayerPreprocessor(cache_dir=None),
+                out_path=os.path.join(tmp, "map.html")
+            ),
+            repeat
+        )
+    record("folium_render", times)
+
+    # -----------------------------------
+    # KD-tree
+    # -----------------------------------
+    parks = city.park_records()
+    times, (tree, meta) = _timeit(lambda: build_park_kdtree(parks), repeat)
+    record("build_park_kdtree", times)
+
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(min(p["lat"] for p in parks), max(p["lat"] for p in parks), 10_000)
+    lons = rng.uniform(min(p["lon"] for p in parks), max(p["lon"] for p in parks), 10_000)
+    times, _ = _timeit(
+        lambda: [nearest_park(tree, meta, lat, lon) for lat, lon in zip(lats, lons)], repeat
+    )
+    record("nearest_park_x10000", times)
+
+    return results
+
+
+def check_regressions(results, baseline, tolerance, min_delta_s=0.02):
+    """
+    Returns a list of (name, baseline_s, current_s) whose minimum time got
+    slower than baseline * (1 + tolerance) and by more than min_delta_s
+    (timer noise dominates very short benchmarks).
+    """
+    slow = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        slower = current["min_s"] > base["min_s"] * (1 + tolerance)
+        if slower and current["min_s"] - base["min_s"] > min_delta_s:
+            slow.append((name, base["min_s"], current["min_s"]))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline hot paths on a synthetic city.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=None, help="Baseline JSON (default: baselines/pipeline_<size>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown fraction for --check")
+    parser.add_argument("--min-delta", type=float, default=0.02, help="Ignore slowdowns smaller than this (s)")
+    parser.add_argument("--out", default=None, help="Also write results to this JSON path")
+    args = parser.parse_args(argv)
+
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"pipeline_{args.size}.json"
+
+    print(f"Benchmarking size={args.size} ({SIZES[args.size]}) x{args.repeat}")
+    results = run_benchmarks(args.size, args.repeat, args.seed)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "size": args.size,
+            "nodes_buildings_parks": SIZES[args.size],
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {baseline_path}")
+
+    if args.check:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}; run with --save-baseline first")
+            return 1
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        slow = check_regressions(results, baseline, args.tolerance, args.min_delta)
+        for name, base, current in slow:
+            print(f"REGRESSION {name}: {base:.4f} s -> {current:.4f} s ({current / base - 1:+.0%})")
+        if slow:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Import-time benchmark for the service, CLI and analysis modules.
+
+Each module is imported in a fresh interpreter, several times; the median
+import time is reported together with the heavy third-party packages the
+import pulled in. Results can be saved as a local JSON baseline (not
+committed; import times are machine specific) and checked later, like
+bench_pipeline.py. --check compares the fastest import:
+
+    python benchmarks/bench_startup.py --save-baseline
+    python benchmarks/bench_startup.py --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "startup.json"
+
+MODULES = [
+    "park_accessibility.kd_park_accessibility.service",
+    "park_accessibility.kd_park_accessibility.kdtree",
+    "park_accessibility.kd_park_accessibility.viz",
+    "park_accessibility.NA_park_accessibility.NA_analysis",
+    "park_accessibility.NA_park_accessibility.NA_data_processing",
+    "park_accessibility.NA_park_accessibility.NA_visualization",
+]
+
+HEAVY = ["scipy", "matplotlib", "folium", "osmnx", "geopandas", "networkx", "shapely", "requests", "pandas"]
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"import_s": dt, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    paths = [str(REPO_ROOT / "src"), str(REPO_ROOT)]
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    return env
+
+
+def measure(module, repeat=5):
+    times, heavy = [], []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+            capture_output=True, text=True, env=_env(), cwd=REPO_ROOT
+        )
+        if proc.returncode != 0:
+            last = (proc.stderr.strip().splitlines() or ["import failed"])[-1]
+            return {"error": last}
+        out = json.loads(proc.stdout.strip().splitlines()[-1])
+        times.append(out["import_s"])
+        heavy = out["heavy"]
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "repeat": len(times),
+        "heavy": heavy,
+    }
+
+
+def check_regressions(results, baseline, tolerance, min_delta_s=0.05):
+    slow = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or "min_s" not in base or "min_s" not in current:
+            continue
+        slower = current["min_s"] > base["min_s"] * (1 + tolerance)
+        if slower and current["min_s"] - base["min_s"] > min_delta_s:
+            slow.append((name, base["min_s"], current["min_s"]))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure module import times in fresh interpreters.")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this (s)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in args.modules:
+        results[module] = r = measure(module, args.repeat)
+        if "error" in r:
+            print(f"  {module:<60} ERROR {r['error']}")
+        else:
+            print(f"  {module:<60} {r['median_s'] * 1000:7.0f} ms  {', '.join(r['heavy']) or '-'}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {baseline_path}")
+
+    if args.check:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}; run with --save-baseline first")
+            return 1
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        slow = check_regressions(results, baseline, args.tolerance, args.min_delta)
+        for name, base, current in slow:
+            print(f"REGRESSION {name}: {base * 1000:.0f} ms -> {current * 1000:.0f} ms")
+        if slow:
+            return 1
+        print(f"No import-time regressions beyond {args.tolerance:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
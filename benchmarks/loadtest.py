@@ -0,0 +1,350 @@
+"""
+Load-test harness for the park accessibility API.
+
+Starts the FastAPI app locally with uvicorn against a fixture park dataset
+(no Overpass calls), drives it with a concurrent request mix and writes
+throughput and p50/p95/p99 latency per endpoint and per worker count as JSON.
+
+Example:
+
+    python benchmarks/loadtest.py --workers 1 2 4 --concurrency 16 --duration 20
+
+Request mix:
+- single: /check_accessibility for a random point inside the fixture bbox
+- cold:   /check_accessibility for a city name never seen before, which
+          forces the service to rebuild its park index
+- batch:  any POST endpoint whose path contains "batch" (only if the app
+          exposes one); the body is {"points": [{"lat": .., "lon": ..}, ...]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "parks.geojson"
+DEFAULT_APP = "park_accessibility.kd_park_accessibility.service:app"
+
+
+# ---------- Fixture ----------
+
+def _fixture_bbox(fixture_path: Path) -> Tuple[float, float, float, float]:
+    """
+    Returns (min_lat, min_lon, max_lat, max_lon) of all park vertices.
+    """
+    data = json.loads(fixture_path.read_text(encoding="utf-8"))
+    lats, lons = [], []
+    for feat in data.get("features", []):
+        for ring in (feat.get("geometry") or {}).get("coordinates", []):
+            for lon, lat in ring:
+                lats.append(lat)
+                lons.append(lon)
+    return min(lats), min(lons), max(lats), max(lons)
+
+
+def _prepare_workdir(fixture_path: Path) -> Path:
+    """
+    The service resolves parks through download_parks_geojson(), which reuses
+    data/parks.geojson relative to the working directory when it exists.
+    Seeding that path with the fixture keeps every request offline.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="park_loadtest_"))
+    (workdir / "data").mkdir()
+    shutil.copyfile(fixture_path, workdir / "data" / "parks.geojson")
+    return workdir
+
+
+# ---------- Server lifecycle ----------
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(app: str, workers: int, port: int, workdir: Path) -> subprocess.Popen:
+    env = dict(os.environ)
+    paths = [str(REPO_ROOT / "src")]
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+
+    cmd = [
+        sys.executable, "-m", "uvicorn", app,
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(workers),
+        "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=workdir, env=env)
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen, timeout_s: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited early with code {proc.returncode}")
+        try:
+            r = requests.get(f"{base_url}/openapi.json", timeout=1)
+            if r.status_code == 200:
+                return r.json()
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+def _stop_server(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _find_batch_path(openapi: dict) -> Optional[str]:
+    for path, ops in openapi.get("paths", {}).items():
+        if "batch" in path and "post" in ops:
+            return path
+    return None
+
+
+# ---------- Load generation ----------
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    """
+    "single=0.8,cold=0.1,batch=0.1" -> {"single": 0.8, "cold": 0.1, "batch": 0.1}
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("single", "cold", "batch"):
+            raise ValueError(f"Unknown request kind in mix: {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+class _Client(threading.Thread):
+    def __init__(self, idx, base_url, mix, bbox, batch_path, batch_size, seed, stop_at, records, lock):
+        super().__init__(daemon=True)
+        self.idx = idx
+        self.base_url = base_url
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.bbox = bbox
+        self.batch_path = batch_path
+        self.batch_size = batch_size
+        self.rng = random.Random(seed + idx)
+        self.stop_at = stop_at
+        self.records = records
+        self.lock = lock
+        self.cold_counter = 0
+
+    def _point(self):
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        return (
+            round(self.rng.uniform(min_lat, max_lat), 6),
+            round(self.rng.uniform(min_lon, max_lon), 6),
+        )
+
+    def _send(self, session, kind):
+        if kind == "batch":
+            points = [dict(zip(("lat", "lon"), self._point())) for _ in range(self.batch_size)]
+            return session.post(f"{self.base_url}{self.batch_path}", json={"points": points}, timeout=30)
+
+        lat, lon = self._point()
+        params = {"lat": lat, "lon": lon}
+        if kind == "cold":
+            self.cold_counter += 1
+            params["city"] = f"ColdCity-{self.idx}-{self.cold_counter}"
+        return session.get(f"{self.base_url}/check_accessibility", params=params, timeout=30)
+
+    def run(self):
+        local = []
+        with requests.Session() as session:
+            while time.monotonic() < self.stop_at:
+                kind = self.rng.choices(self.kinds, weights=self.weights)[0]
+                t0 = time.perf_counter()
+                try:
+                    ok = self._send(session, kind).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                local.append((kind, time.perf_counter() - t0, ok))
+        with self.lock:
+            self.records.extend(local)
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    """
+    Linear-interpolated percentile of an already sorted list, q in [0, 100].
+    """
+    if not sorted_vals:
+        return float("nan")
+    pos = (len(sorted_vals) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (pos - lo)
+
+
+def _summarise(records: List[Tuple[str, float, bool]], elapsed_s: float) -> dict:
+    lat_ms = sorted(r[1] * 1000.0 for r in records)
+    errors = sum(1 for r in records if not r[2])
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "throughput_rps": round(len(records) / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(lat_ms) / len(lat_ms), 3) if lat_ms else None,
+        "p50_ms": round(_percentile(lat_ms, 50), 3) if lat_ms else None,
+        "p95_ms": round(_percentile(lat_ms, 95), 3) if lat_ms else None,
+        "p99_ms": round(_percentile(lat_ms, 99), 3) if lat_ms else None,
+    }
+
+
+def run_load(base_url, mix, bbox, batch_path, concurrency, duration_s, warmup_s, batch_size, seed) -> dict:
+    # Warm-up run: populate caches, results discarded
+    if warmup_s > 0:
+        warm_mix = {"single": 1.0}
+        _drive(base_url, warm_mix, bbox, None, concurrency, warmup_s, batch_size, seed)
+
+    records, elapsed = _drive(base_url, mix, bbox, batch_path, concurrency, duration_s, batch_size, seed)
+
+    endpoints = {}
+    for kind in mix:
+        subset = [r for r in records if r[0] == kind]
+        if subset:
+            endpoints[kind] = _summarise(subset, elapsed)
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "overall": _summarise(records, elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def _drive(base_url, mix, bbox, batch_path, concurrency, duration_s, batch_size, seed):
+    records: List[Tuple[str, float, bool]] = []
+    lock = threading.Lock()
+    t0 = time.monotonic()
+    stop_at = t0 + duration_s
+    clients = [
+        _Client(i, base_url, mix, bbox, batch_path, batch_size, seed, stop_at, records, lock)
+        for i in range(concurrency)
+    ]
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    return records, time.monotonic() - t0
+
+
+# ---------- Entry point ----------
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the park accessibility API.")
+    parser.add_argument("--app", default=DEFAULT_APP, help="uvicorn app import string")
+    parser.add_argument("--fixture", default=str(DEFAULT_FIXTURE), help="Park GeoJSON served by the app")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="uvicorn worker counts to test")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Warm-up seconds per worker count")
+    parser.add_argument("--mix", default="single=0.9,cold=0.05,batch=0.05",
+                        help="Request mix weights, e.g. single=0.8,cold=0.2")
+    parser.add_argument("--batch-size", type=int, default=50, help="Points per batch request")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument("--out", default=None, help="Output JSON path")
+    args = parser.parse_args(argv)
+
+    fixture = Path(args.fixture)
+    mix = _parse_mix(args.mix)
+    bbox = _fixture_bbox(fixture)
+    workdir = _prepare_workdir(fixture)
+
+    runs = []
+    try:
+        for workers in args.workers:
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            proc = _start_server(args.app, workers, port, workdir)
+            try:
+                openapi = _wait_ready(base_url, proc)
+                batch_path = _find_batch_path(openapi)
+                run_mix = dict(mix)
+                if batch_path is None:
+                    run_mix.pop("batch", None)
+
+                print(f"workers={workers}: driving {args.concurrency} clients for {args.duration}s "
+                      f"(mix={run_mix})")
+                result = run_load(
+                    base_url, run_mix, bbox, batch_path,
+                    args.concurrency, args.duration, args.warmup, args.batch_size, args.seed,
+                )
+                result["workers"] = workers
+                result["batch_endpoint"] = batch_path
+                runs.append(result)
+
+                overall = result["overall"]
+                print(f"  {overall['throughput_rps']} req/s, p50={overall['p50_ms']} ms, "
+                      f"p95={overall['p95_ms']} ms, p99={overall['p99_ms']} ms, errors={overall['errors']}")
+            finally:
+                _stop_server(proc)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": now.isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "app": args.app,
+            "fixture": str(fixture),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "runs": runs,
+    }
+
+    out_path = Path(args.out) if args.out else (
+        Path(__file__).resolve().parent / "results" / f"loadtest-{now.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved results to {out_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
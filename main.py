@@ -1,7 +1,11 @@
-from src.park_accessibility.NA_park_accessibility.NA_data_processing import get_ams_data
+from src.park_accessibility.NA_park_accessibility.NA_data_processing import get_ams_data, get_area_data
 from src.park_accessibility.NA_park_accessibility.NA_analysis import ParkAccessibility
 from src.park_accessibility.NA_park_accessibility.NA_visualization import FoliumVisualization
 from src.park_accessibility.NA_park_accessibility.NA_visualization import MatplotlibVisualization
+from src.park_accessibility.NA_park_accessibility.NA_tiles import TilePyramidExporter
+from src.park_accessibility.NA_park_accessibility.NA_raster import AccessibilityRaster
+from src.park_accessibility.NA_park_accessibility.NA_instrumentation import configure_from_env, stage
+from src.park_accessibility.NA_park_accessibility.NA_aggregates import AreaAggregates
 import os
 import webbrowser
 
@@ -12,65 +16,122 @@ def main():
     TARGET_CRS = "EPSG:28992"
     MAX_DISTANCE = 1500  # meters
 
+    # Stage timings / memory: PARK_ACCESS_INSTRUMENT=1 (see NA_instrumentation.py)
+    recorder = configure_from_env()
+
     # -------------------------------
     # Load or download AMS datasets
     # -------------------------------
-    ams_boundary, parks_ams, buildings_ams, walking_edges_ams = get_ams_data()
+    with stage("load_data"):
+        ams_boundary, parks_ams, buildings_ams, walking_edges_ams = get_ams_data()
 
     # -------------------------------
     # Initialize model
     # -------------------------------
-    access_model = ParkAccessibility(
-        place_name="Amsterdam, Netherlands",
-        target_crs=TARGET_CRS
-    )
+    with stage("init_graph"):
+        access_model = ParkAccessibility(
+            place_name="Amsterdam, Netherlands",
+            target_crs=TARGET_CRS
+        )
 
     # -------------------------------
     # Generate centroids and snap to graph
     # -------------------------------
-    buildings_pts, park_nodes = access_model.generate_building_centroids_and_snap(
-        buildings_ams,
-        parks_ams
-    )
+    with stage("snap"):
+        buildings_pts, park_nodes = access_model.generate_building_centroids_and_snap(
+            buildings_ams,
+            parks_ams
+        )
 
     # -------------------------------
     # Compute accessibility
     # -------------------------------
-    accessibility_gdf = access_model.compute_accessibility(
-        building_centroids_gdf=buildings_pts,
-        park_nodes=park_nodes,
-        max_distance=MAX_DISTANCE
-    )
+    with stage("compute_accessibility"):
+        accessibility_gdf = access_model.compute_accessibility(
+            building_centroids_gdf=buildings_pts,
+            park_nodes=park_nodes,
+            max_distance=MAX_DISTANCE
+        )
 
     # -------------------------------
     # Save output
     # -------------------------------
     os.makedirs("outputs/NA_outputs", exist_ok=True)
     if not os.path.exists("outputs/NA_outputs/buildings_park_access_1500m.gpkg"):
-        accessibility_gdf.to_file(
-            "outputs/NA_outputs/buildings_park_access_1500m.gpkg",
-            driver="GPKG"
-        )
+        with stage("write_accessibility_gpkg"):
+            accessibility_gdf.to_file(
+                "outputs/NA_outputs/buildings_park_access_1500m.gpkg",
+                driver="GPKG"
+            )
+
+    # -------------------------------
+    # Per-neighbourhood / district aggregates for dashboards
+    # -------------------------------
+    aggregates_path = "outputs/NA_outputs/area_aggregates.npz"
+    with stage("area_aggregates"):
+        aggregates = None
+        if os.path.exists(aggregates_path):
+            aggregates = AreaAggregates.load(aggregates_path)
+            try:
+                # Only areas whose buildings changed distance bin are touched
+                aggregates.refresh(accessibility_gdf)
+            except KeyError:
+                aggregates = None
+        if aggregates is None:
+            aggregates = AreaAggregates.build(accessibility_gdf, get_area_data())
+        aggregates.save(aggregates_path)
 
     print("✅ Accessibility analysis complete")
     print(accessibility_gdf[f"park_access_{MAX_DISTANCE}m"].value_counts())
 
-    m = FoliumVisualization.plot_map(
-        buildings_gdf=accessibility_gdf,
-        street_gdf=walking_edges_ams,
-        park_gdf=parks_ams,
-        ams_boundary=ams_boundary
-    )
+    with stage("folium_render"):
+        m = FoliumVisualization.plot_map(
+            buildings_gdf=accessibility_gdf,
+            street_gdf=walking_edges_ams,
+            park_gdf=parks_ams,
+            ams_boundary=ams_boundary
+        )
 
     # Open the map automatically
     map_path = os.path.abspath("outputs/NA_outputs/amsterdam_park_accessibility.html")
     webbrowser.open(f"file://{map_path}")
 
-    fig = MatplotlibVisualization.plot_map(building_gdf=accessibility_gdf)
-    fig.savefig("outputs/NA_outputs/amsterdam_park_accessibility_matplotlib.png")
+    # -------------------------------
+    # Vector tiles (served by the API at /tiles/{z}/{x}/{y})
+    # -------------------------------
+    with stage("tile_export"):
+        TilePyramidExporter().export(
+            buildings_gdf=accessibility_gdf,
+            street_gdf=walking_edges_ams,
+            park_gdf=parks_ams,
+            out_path="outputs/NA_outputs/park_tiles.pkt",
+            max_distance=MAX_DISTANCE
+        )
+        FoliumVisualization.plot_tiled_map(ams_boundary=ams_boundary)
 
-    fig2= MatplotlibVisualization.plot_accessibility_vs_distance(building_gdf=accessibility_gdf)
-    fig2.savefig("outputs/NA_outputs/pairwise_visualization.png")
+    # -------------------------------
+    # Rasterized accessibility surface (10 m grid)
+    # -------------------------------
+    with stage("raster"):
+        surface = AccessibilityRaster.from_buildings(
+            accessibility_gdf,
+            cell_size=10,
+            boundary_gdf=ams_boundary
+        )
+        surface.write_bil("outputs/NA_outputs/dist_to_park_10m.bil")
+        surface.write_png_overlay("outputs/NA_outputs/dist_to_park_10m.png", vmax=MAX_DISTANCE)
+
+    with stage("matplotlib"):
+        fig = MatplotlibVisualization.plot_map(building_gdf=accessibility_gdf)
+        fig.savefig("outputs/NA_outputs/amsterdam_park_accessibility_matplotlib.png")
+
+        fig2= MatplotlibVisualization.plot_accessibility_vs_distance(building_gdf=accessibility_gdf)
+        fig2.savefig("outputs/NA_outputs/pairwise_visualization.png")
     print("✅ Map generated and saved to NA_outputs/amsterdam_park_accessibility.html")
+
+    if recorder.enabled:
+        report_path = recorder.write_report("outputs/NA_outputs/run_report.json")
+        print(recorder.summary())
+        print(f"📊 Stage report saved to {report_path}")
 if __name__ == "__main__":
     main()
@@ -0,0 +1,281 @@
+"""
+Per-area accessibility aggregates (neighbourhoods, districts, ...).
+
+Buildings are assigned to the areas of each level once, with a bulk
+spatial-index join. From then on each area only keeps a distance
+histogram, i.e. one row of an (n_areas, n_bins) integer array:
+
+    bins 0 .. n-2   (edges[i], edges[i + 1]] meters (the first includes 0)
+    bin  n-1        beyond the last edge or unreachable
+
+Coverage rates and distance percentiles are read from the histograms, so
+dashboards never re-read the building file or redo the spatial join. When
+building distances change, refresh()/update() move those buildings between
+bins and only the histograms of their areas change.
+"""
+
+import numpy as np
+
+DEFAULT_BIN_EDGES = tuple(range(0, 1501, 100))
+
+
+def distance_bins(distances, bin_edges):
+    """
+    Histogram bin of every distance (NaN = unreachable -> last bin).
+    """
+    edges = np.asarray(bin_edges, dtype=float)
+    d = np.asarray(distances, dtype=float)
+    bins = np.searchsorted(edges, np.where(np.isnan(d), np.inf, d), side="left") - 1
+    return np.clip(bins, 0, len(edges) - 1).astype(np.int16)
+
+
+class AreaAggregates:
+    """
+    levels: {level: {"codes", "names", "assignment", "hist"}}
+        assignment: area row of every building (-1 = outside all areas)
+        hist: (n_areas, n_bins) building counts
+    building_ids / building_bins: every building and its current bin
+    """
+
+    def __init__(self, levels, building_ids, building_bins, bin_edges):
+        self.levels = levels
+        self.building_ids = building_ids
+        self.building_bins = building_bins
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        self._order = np.argsort(building_ids, kind="stable")
+
+    @property
+    def n_bins(self):
+        return len(self.bin_edges)
+
+    # -----------------------------------
+    # Build
+    # -----------------------------------
+    @classmethod
+    def build(
+        cls,
+        buildings_gdf,
+        areas,
+        dist_col="dist_to_park_m",
+        bin_edges=DEFAULT_BIN_EDGES,
+        id_col=None
+    ):
+        """
+        buildings_gdf: output of compute_accessibility (building points)
+        areas: {level: GeoDataFrame with code, name, geometry}
+        id_col: unique building key (default: the index)
+        """
+        ids = buildings_gdf[id_col] if id_col else buildings_gdf.index
+        building_ids = _as_key_array(ids)
+        if len(np.unique(building_ids)) != len(building_ids):
+            raise ValueError("Building ids must be unique")
+
+        points = buildings_gdf.geometry
+        if not (points.geom_type == "Point").all():
+            points = points.centroid
+        bins = distance_bins(buildings_gdf[dist_col], bin_edges)
+
+        levels = {}
+        for level, area_gdf in areas.items():
+            area_gdf = area_gdf.to_crs(buildings_gdf.crs)
+            # Bulk STRtree query: (building, area) pairs; a building on a
+            # shared border keeps its first match
+            b_idx, a_idx = area_gdf.sindex.query(points, predicate="intersects")
+            first_b, first = np.unique(b_idx, return_index=True)
+            assignment = np.full(len(building_ids), -1, dtype=np.int32)
+            assignment[first_b] = a_idx[first]
+
+            levels[level] = {
+                "codes": _as_key_array(area_gdf["code"]),
+                "names": _as_key_array(area_gdf["name"]),
+                "assignment": assignment,
+                "hist": np.zeros((len(area_gdf), len(bin_edges)), dtype=np.int64),
+            }
+            _add_counts(levels[level]["hist"], assignment, bins, +1)
+
+        return cls(levels, building_ids, bins, bin_edges)
+
+    # -----------------------------------
+    # Incremental updates
+    # -----------------------------------
+    def update(self, building_ids, distances):
+        """
+        Apply new distances for some buildings. Only the histograms of the
+        areas those buildings belong to change.
+        Returns {level: codes of the affected areas}.
+        """
+        rows = self._rows(_as_key_array(building_ids))
+        new_bins = distance_bins(distances, self.bin_edges)
+        changed = new_bins != self.building_bins[rows]
+        rows, new_bins = rows[changed], new_bins[changed]
+
+        affected = {}
+        for level, data in self.levels.items():
+            assignment = data["assignment"][rows]
+            _add_counts(data["hist"], assignment, self.building_bins[rows], -1)
+            _add_counts(data["hist"], assignment, new_bins, +1)
+            affected[level] = data["codes"][np.unique(assignment[assignment >= 0])]
+
+        self.building_bins[rows] = new_bins
+        return affected
+
+    def remove(self, building_ids):
+        """
+        Drop buildings and subtract them from their areas' histograms.
+        Returns {level: codes of the affected areas}.
+        """
+        rows = self._rows(_as_key_array(building_ids))
+        keep = np.ones(len(self.building_ids), dtype=bool)
+        keep[rows] = False
+
+        affected = {}
+        for level, data in self.levels.items():
+            assignment = data["assignment"][rows]
+            _add_counts(data["hist"], assignment, self.building_bins[rows], -1)
+            affected[level] = data["codes"][np.unique(assignment[assignment >= 0])]
+            data["assignment"] = data["assignment"][keep]
+
+        self.building_ids = self.building_ids[keep]
+        self.building_bins = self.building_bins[keep]
+        self._order = np.argsort(self.building_ids, kind="stable")
+        return affected
+
+    def refresh(self, buildings_gdf, dist_col="dist_to_park_m", id_col=None):
+        """
+        update() with a full new result: only buildings whose distance bin
+        changed are touched, and buildings missing from the result are
+        removed. New buildings need an area assignment, so they raise
+        KeyError; rebuild the aggregates in that case.
+        """
+        ids = _as_key_array(buildings_gdf[id_col] if id_col else buildings_gdf.index)
+        if not np.isin(ids, self.building_ids).all():
+            raise KeyError("New building ids; rebuild the aggregates for new buildings")
+
+        gone = self.building_ids[~np.isin(self.building_ids, ids)]
+        removed = self.remove(gone) if len(gone) else None
+        affected = self.update(ids, buildings_gdf[dist_col].to_numpy(dtype=float))
+        if removed is not None:
+            affected = {
+                level: np.unique(np.concatenate([removed[level], codes]))
+                for level, codes in affected.items()
+            }
+        return affected
+
+    def _rows(self, ids):
+        pos = np.searchsorted(self.building_ids, ids, sorter=self._order)
+        pos = np.clip(pos, 0, len(self._order) - 1)
+        rows = self._order[pos]
+        if len(ids) and not (self.building_ids[rows] == ids).all():
+            raise KeyError("Unknown building ids; rebuild the aggregates for new buildings")
+        return rows
+
+    # -----------------------------------
+    # Queries
+    # -----------------------------------
+    def coverage(self, level, within=None):
+        """
+        (buildings, accessible, rate) per area; accessible = distance <=
+        within, which must be one of the bin edges (default: the last).
+        """
+        hist = self.levels[level]["hist"]
+        within = self.bin_edges[-1] if within is None else within
+        matches = np.flatnonzero(self.bin_edges == within)
+        if not len(matches) or matches[0] == 0:
+            raise ValueError(f"within must be one of the bin edges {self.bin_edges[1:].tolist()}")
+        total = hist.sum(axis=1)
+        accessible = hist[:, :matches[0]].sum(axis=1)
+        rate = np.divide(accessible, total, out=np.full(len(total), np.nan), where=total > 0)
+        return total, accessible, rate
+
+    def percentiles(self, level, q=(50, 90)):
+        """
+        (n_areas, len(q)) distance percentiles, interpolated linearly inside
+        the histogram bins. inf when the percentile falls among unreachable
+        buildings, NaN for empty areas.
+        """
+        hist = self.levels[level]["hist"].astype(float)
+        total = hist.sum(axis=1)
+        cum = np.cumsum(hist, axis=1)
+        edges = self.bin_edges
+
+        out = np.full((len(hist), len(q)), np.nan)
+        for j, p in enumerate(q):
+            target = total * p / 100.0
+            # First bin whose cumulative count reaches the target
+            b = np.minimum((cum < target[:, None]).sum(axis=1), self.n_bins - 1)
+            regular = b < self.n_bins - 1
+            rows = np.flatnonzero(regular & (total > 0))
+            before = np.where(b[rows] > 0, cum[rows, b[rows] - 1], 0.0)
+            frac = (target[rows] - before) / np.maximum(hist[rows, b[rows]], 1)
+            out[rows, j] = edges[b[rows]] + frac * (edges[b[rows] + 1] - edges[b[rows]])
+            out[~regular & (total > 0), j] = np.inf
+        return out
+
+    def table(self, level, q=(50, 90), within=None):
+        """
+        Dashboard table: one row per area with counts, coverage and percentiles.
+        """
+        import pandas as pd
+
+        data = self.levels[level]
+        total, accessible, rate = self.coverage(level, within)
+        df = pd.DataFrame({
+            "code": data["codes"],
+            "name": data["names"],
+            "buildings": total,
+            "accessible": accessible,
+            "coverage": rate,
+        })
+        values = self.percentiles(level, q)
+        for j, p in enumerate(q):
+            df[f"p{p}_m"] = values[:, j]
+        return df
+
+    # -----------------------------------
+    # Storage
+    # -----------------------------------
+    def save(self, path="outputs/NA_outputs/area_aggregates.npz"):
+        import os
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "bin_edges": self.bin_edges,
+            "building_ids": self.building_ids,
+            "building_bins": self.building_bins,
+            "levels": np.array(list(self.levels)),
+        }
+        for level, data in self.levels.items():
+            for key, values in data.items():
+                arrays[f"{level}__{key}"] = values
+        np.savez_compressed(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path="outputs/NA_outputs/area_aggregates.npz"):
+        with np.load(path) as f:
+            levels = {
+                str(level): {
+                    key: f[f"{level}__{key}"]
+                    for key in ("codes", "names", "assignment", "hist")
+                }
+                for level in f["levels"]
+            }
+            return cls(levels, f["building_ids"], f["building_bins"].copy(), f["bin_edges"])
+
+
+def _add_counts(hist, assignment, bins, sign):
+    inside = assignment >= 0
+    flat = assignment[inside].astype(np.int64) * hist.shape[1] + bins[inside]
+    counts = np.bincount(flat, minlength=hist.size).reshape(hist.shape)
+    hist += sign * counts
+
+
+def _as_key_array(values):
+    """
+    Numeric ids stay int64; anything else becomes fixed-width unicode so
+    the arrays can be stored without pickling.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int64)
+    return arr.astype(str)
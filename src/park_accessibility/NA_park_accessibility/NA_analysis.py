@@ -1,19 +1,33 @@
-import osmnx as ox
-import networkx as nx
+# osmnx/networkx are imported where used: they dominate import time
+from .NA_instrumentation import stage
+from .NA_profiles import CROSSING_NODE_TAGS, GraphTopology, resolve_profile
 
 
 class ParkAccessibility:
-    def __init__(self, place_name, target_crs="EPSG:28992"):
+    def __init__(self, place_name=None, target_crs="EPSG:28992", graph=None, slim=False):
         """
-        Initialize walking network for accessibility analysis
+        Initialize walking network for accessibility analysis.
+        Pass graph to reuse an existing walk graph instead of downloading one.
+        Pass slim=True to keep a smaller undirected graph (see slim_graph).
+        compute_accessibility then searches it with degree-2 chains contracted.
         """
+        import osmnx as ox
+
         self.target_crs = target_crs
+        self.slim = slim
+        self._contracted = None
 
-        self.G = ox.graph_from_place(
-            place_name,
-            network_type="walk"
-        )
-        self.G = ox.project_graph(self.G, to_crs=target_crs)
+        if graph is None:
+            with stage("download_walk_graph"):
+                graph = ox.graph_from_place(
+                    place_name,
+                    network_type="walk"
+                )
+        with stage("project_graph"):
+            self.G = ox.project_graph(graph, to_crs=target_crs)
+        if slim:
+            with stage("slim_graph"):
+                self.G = slim_graph(self.G)
 
     # -----------------------------------
     # Prepare buildings & parks
@@ -23,25 +37,31 @@ class ParkAccessibility:
         buildings_gdf,
         parks_gdf
     ):
+        import osmnx as ox
+
         # Buildings → centroids → nearest nodes
-        buildings = buildings_gdf.copy()
-        buildings = buildings.to_crs(self.target_crs)
-        buildings["geometry"] = buildings.geometry.centroid
-        buildings["nearest_node"] = ox.nearest_nodes(
-            self.G,
-            buildings.geometry.x,
-            buildings.geometry.y
-        )
+        with stage("snap_buildings"):
+            buildings = buildings_gdf.copy()
+            buildings = buildings.to_crs(self.target_crs)
+            # Footprint area: default demand weight for compute_2sfca()
+            buildings["footprint_m2"] = buildings.geometry.area
+            buildings["geometry"] = buildings.geometry.centroid
+            buildings["nearest_node"] = ox.nearest_nodes(
+                self.G,
+                buildings.geometry.x,
+                buildings.geometry.y
+            )
 
         # Parks → centroids → nearest nodes
-        parks = parks_gdf.copy()
-        parks = parks.to_crs(self.target_crs)
-        parks["geometry"] = parks.geometry.centroid
-        park_nodes = ox.nearest_nodes(
-            self.G,
-            parks.geometry.x,
-            parks.geometry.y
-        )
+        with stage("snap_parks"):
+            parks = parks_gdf.copy()
+            parks = parks.to_crs(self.target_crs)
+            parks["geometry"] = parks.geometry.centroid
+            park_nodes = ox.nearest_nodes(
+                self.G,
+                parks.geometry.x,
+                parks.geometry.y
+            )
 
         return buildings, list(set(park_nodes))
 
@@ -54,21 +74,31 @@ class ParkAccessibility:
         park_nodes,
         max_distance=1500
     ):
+        import networkx as nx
+
         gdf = building_centroids_gdf.copy()
 
-        distances = nx.multi_source_dijkstra_path_length(
-            self.G,
-            park_nodes,
-            cutoff=max_distance,
-            weight="length"
-        )
+        graph = self.G
+        if self.slim:
+            with stage("contract_graph"):
+                graph = self.search_graph(set(gdf["nearest_node"]) | set(park_nodes))
 
-        gdf["dist_to_park_m"] = gdf["nearest_node"].map(distances)
-        gdf[f"park_access_{max_distance}m"] = gdf["dist_to_park_m"].notnull()
+        with stage("dijkstra"):
+            distances = nx.multi_source_dijkstra_path_length(
+                graph,
+                park_nodes,
+                cutoff=max_distance,
+                weight="length"
+            )
+
+        with stage("distance_join"):
+            gdf["dist_to_park_m"] = gdf["nearest_node"].map(distances)
+            gdf[f"park_access_{max_distance}m"] = gdf["dist_to_park_m"].notnull()
+        access_col = f"park_access_{max_distance}m"
         print("Data overview:")
         print(f"Total buildings: {len(gdf)}")
-        print(f"Buildings with park_access_1500m=True: {gdf['park_access_1500m'].sum()}")
-        print(f"Buildings with park_access_1500m=False: {(~gdf['park_access_1500m']).sum()}")
+        print(f"Buildings with {access_col}=True: {gdf[access_col].sum()}")
+        print(f"Buildings with {access_col}=False: {(~gdf[access_col]).sum()}")
 
         # Check for NaN/inf values in distance column
         print(f"\nDistance column statistics:")
@@ -77,3 +107,393 @@ class ParkAccessibility:
         print(f"Mean distance: {gdf['dist_to_park_m'].mean()}")
 
         return gdf
+
+    def search_graph(self, keep_nodes):
+        """
+        Slim graph with degree-2 chains contracted, keeping keep_nodes
+        (the snapped building and park nodes). Cached for the last node set.
+        """
+        keep_nodes = frozenset(keep_nodes)
+        if self._contracted is None or self._contracted[0] != keep_nodes:
+            self._contracted = (keep_nodes, contract_degree_two(self.G, keep_nodes))
+        return self._contracted[1]
+
+    # -----------------------------------
+    # Walking profiles
+    # -----------------------------------
+    def compute_accessibility_profiles(
+        self,
+        building_centroids_gdf,
+        park_nodes,
+        profiles=("default", "slow"),
+        max_distance=1500
+    ):
+        """
+        compute_accessibility() for several walking profiles at once (names
+        from NA_profiles.PROFILES, WalkingProfile objects or dicts).
+        Costs are effective meters, so max_distance applies to every
+        profile. Adds dist_to_park_m_<profile> and
+        park_access_<max_distance>m_<profile> columns.
+        """
+        import numpy as np
+
+        topology = self.topology()
+        profiles = [resolve_profile(p) for p in profiles]
+        gdf = building_centroids_gdf.copy()
+
+        with stage("dijkstra_profiles"):
+            distances = topology.multi_profile_distances(topology.rows(park_nodes), profiles, max_distance)
+
+        building_rows = topology.rows(gdf["nearest_node"])
+        for profile in profiles:
+            dist = distances[profile.name][building_rows]
+            reached = np.isfinite(dist)
+            gdf[f"dist_to_park_m_{profile.name}"] = np.where(reached, dist, np.nan)
+            gdf[f"park_access_{max_distance}m_{profile.name}"] = reached
+            print(f"{profile.name:<20} {int(reached.sum())} of {len(gdf)} buildings within {max_distance} m")
+
+        return gdf
+
+    # -----------------------------------
+    # Capacity-weighted accessibility (2SFCA)
+    # -----------------------------------
+    def topology(self):
+        """
+        Shared CSR structure of the walk graph (cached), see NA_profiles.
+        """
+        if getattr(self, "_topology", None) is None:
+            self._topology = GraphTopology(self.G)
+        return self._topology
+
+    def graph_csr(self):
+        """
+        Walk graph as a CSR matrix of edge lengths (cached), plus the node
+        id of every row.
+        """
+        if getattr(self, "_csr", None) is None:
+            topology = self.topology()
+            self._csr = (topology.csr("default"), topology.node_ids)
+        return self._csr
+
+    def compute_2sfca(
+        self,
+        building_centroids_gdf,
+        parks_gdf,
+        max_distance=1500,
+        demand="footprint_m2",
+        n_jobs=None
+    ):
+        """
+        Two-step floating catchment accessibility.
+
+        Step 1: every park gets a supply ratio R = area / demand of all
+        buildings within max_distance walking distance of it.
+        Step 2: every building scores the sum of R over the parks it reaches.
+
+        Buildings are weighted by the demand column (footprint area by
+        default; None counts every building once). The building x park
+        catchment matrix W is sparse, so both steps are a single sparse
+        matrix-vector product: R = S / (W.T @ P), A = W @ R.
+
+        Returns (buildings, parks): buildings with sfca_score (m² of park
+        per unit of demand) and sfca_parks (parks within reach), parks with
+        supply_m2, catchment_demand and supply_ratio.
+        """
+        import numpy as np
+        import scipy.sparse as sp
+
+        csr, node_ids = self.graph_csr()
+        node_index = {n: i for i, n in enumerate(node_ids.tolist())}
+
+        buildings = building_centroids_gdf.copy()
+        if demand is None:
+            weights = np.ones(len(buildings))
+        else:
+            weights = buildings[demand].to_numpy(dtype=float)
+        building_nodes = buildings["nearest_node"].map(node_index).to_numpy()
+
+        # Parks: supply = polygon area, snapped by centroid
+        with stage("snap_park_supply"):
+            parks, park_rows = self._snap_park_rows(parks_gdf, node_index)
+            supply = parks.geometry.area.to_numpy(dtype=float)
+
+        # Catchments of the distinct park nodes: (source, node) pairs within reach
+        with stage("park_catchments"):
+            sources, source_of_park = np.unique(park_rows, return_inverse=True)
+            src, reached, _ = bounded_catchments(csr, sources, max_distance, n_jobs=n_jobs)
+            catchment = sp.csr_matrix(
+                (np.ones(len(src)), (src, reached)),
+                shape=(len(sources), csr.shape[0])
+            )
+
+        with stage("sfca_products"):
+            # building x node incidence, then W = B @ catchment.T (building x park)
+            B = sp.csr_matrix(
+                (np.ones(len(buildings)), (np.arange(len(buildings)), building_nodes)),
+                shape=(len(buildings), csr.shape[0])
+            )
+            W = (B @ catchment[source_of_park].T).tocsr()
+
+            catchment_demand = W.T @ weights
+            ratio = np.divide(supply, catchment_demand, out=np.zeros_like(supply), where=catchment_demand > 0)
+            buildings["sfca_score"] = W @ ratio
+            buildings["sfca_parks"] = np.diff(W.indptr)
+
+        parks = parks_gdf.copy()
+        parks["supply_m2"] = supply
+        parks["catchment_demand"] = catchment_demand
+        parks["supply_ratio"] = ratio
+
+        print(f"2SFCA ({max_distance} m): {int((buildings['sfca_parks'] > 0).sum())} of {len(buildings)} buildings reach a park")
+        return buildings, parks
+
+    def _snap_park_rows(self, parks_gdf, node_index):
+        """
+        Parks in the target CRS and the CSR row of each park's nearest node
+        (one row per park, in parks_gdf order).
+        """
+        import numpy as np
+        import osmnx as ox
+
+        parks = parks_gdf.to_crs(self.target_crs)
+        centroids = parks.geometry.centroid
+        park_nodes = ox.nearest_nodes(self.G, centroids.x, centroids.y)
+        return parks, np.array([node_index[n] for n in np.asarray(park_nodes).tolist()], dtype=np.int64)
+
+    # -----------------------------------
+    # k nearest parks
+    # -----------------------------------
+    def compute_k_nearest_parks(
+        self,
+        building_centroids_gdf,
+        parks_gdf,
+        k=3,
+        max_distance=1500
+    ):
+        """
+        The k nearest distinct parks of every building within max_distance,
+        found in one labelled multi-source Dijkstra (see k_nearest_sources).
+
+        Returns (park_ids, distances), both (n_buildings, k) and sorted by
+        distance: park_ids are positions in parks_gdf (-1 = none),
+        distances are meters (NaN = none).
+        """
+        import numpy as np
+
+        csr, node_ids = self.graph_csr()
+        node_index = {n: i for i, n in enumerate(node_ids.tolist())}
+
+        with stage("snap_parks"):
+            _, park_rows = self._snap_park_rows(parks_gdf, node_index)
+
+        with stage("k_nearest_sweep"):
+            node_parks, node_dist = k_nearest_sources(csr, park_rows, k, max_distance)
+
+        building_rows = building_centroids_gdf["nearest_node"].map(node_index).to_numpy()
+        park_ids = node_parks[building_rows]
+        distances = node_dist[building_rows]
+        distances[park_ids < 0] = np.nan
+
+        reached = (park_ids[:, 0] >= 0).sum()
+        print(f"k-nearest parks (k={k}, {max_distance} m): {reached} of {len(park_ids)} buildings reach a park")
+        return park_ids, distances
+
+
+# -----------------------------------
+# Slim graph
+# -----------------------------------
+def slim_graph(G, weight="length"):
+    """
+    Undirected nx.Graph with only what a walking search, snapping and the
+    walking profiles need: node x/y (plus crossing=True on crossing nodes),
+    one edge per node pair with the minimum weight over parallel edges and
+    both directions, and graph["crs"].
+    Edge highway values are small integer codes into graph["highway_names"].
+    When parallel edges have different highway values, the edge also keeps
+    parallel = {code: minimum weight}, so every profile can still pick its
+    cheapest one. osmnx walk networks are two-way, so distances are unchanged.
+    """
+    import networkx as nx
+
+    highway_codes = {}
+    H = nx.Graph(crs=G.graph.get("crs"))
+    H.add_nodes_from((n, {"x": d["x"], "y": d["y"]}) for n, d in G.nodes(data=True))
+    for n, tag in G.nodes(data="highway"):
+        if tag in CROSSING_NODE_TAGS:
+            H.nodes[n]["crossing"] = True
+    adj = H._adj
+    for u, v, data in G.edges(data=True):
+        if u == v:
+            continue
+        w = data.get(weight, 1.0)
+        hw = data.get("highway", "")
+        # Simplified edges may carry several highway values
+        code = highway_codes.setdefault(hw[0] if isinstance(hw, list) else hw, len(highway_codes))
+        current = adj[u].get(v)
+        if current is None:
+            H.add_edge(u, v, **{weight: w, "highway": code})
+            continue
+        parallel = current.get("parallel")
+        if parallel is None and code != current["highway"]:
+            parallel = current["parallel"] = {current["highway"]: current[weight]}
+        if parallel is not None:
+            parallel[code] = min(w, parallel.get(code, w))
+        if w < current[weight]:
+            current[weight] = w
+            current["highway"] = code
+    H.graph["highway_names"] = list(highway_codes)
+    return H
+
+
+def contract_degree_two(G, keep_nodes, weight="length"):
+    """
+    Replace chains of degree-2 nodes by a single edge whose weight is the
+    chain length. Nodes in keep_nodes are never removed, so shortest-path
+    distances between all remaining nodes are preserved (up to float
+    rounding of the summed lengths). Closed loops without a kept node are
+    dropped; they can't be on a shortest path between kept nodes.
+    """
+    import networkx as nx
+
+    adj = G._adj
+
+    def interior(n):
+        return len(adj[n]) == 2 and n not in keep_nodes
+
+    H = nx.Graph(crs=G.graph.get("crs"))
+    anchors = [n for n in G.nodes if not interior(n)]
+    H.add_nodes_from((n, {"x": G.nodes[n]["x"], "y": G.nodes[n]["y"]}) for n in anchors)
+    H_adj = H._adj
+
+    for s in anchors:
+        for nbr, data in adj[s].items():
+            length = data[weight]
+            prev, cur = s, nbr
+            while interior(cur):
+                a, b = adj[cur]
+                nxt = b if a == prev else a
+                length += adj[cur][nxt][weight]
+                prev, cur = cur, nxt
+            if cur == s:
+                continue
+            edge = H_adj[s].get(cur)
+            if edge is None:
+                H.add_edge(s, cur, **{weight: length})
+            elif length < edge[weight]:
+                edge[weight] = length
+    return H
+
+
+# -----------------------------------
+# Sparse graph helpers
+# -----------------------------------
+def graph_to_csr(G, weight="length"):
+    """
+    (csr, node_ids): directed adjacency of G with the shortest parallel edge
+    per node pair as weight; row/column i is node node_ids[i].
+    """
+    topology = GraphTopology(G, weight=weight)
+    return topology.csr("default"), topology.node_ids
+
+
+_CATCHMENT_GRAPH = None
+
+
+def _catchment_chunk(args):
+    import numpy as np
+    from scipy.sparse.csgraph import dijkstra
+
+    offset, sources, limit = args
+    dist = dijkstra(_CATCHMENT_GRAPH, directed=True, indices=sources, limit=limit)
+    rows, cols = np.nonzero(np.isfinite(dist))
+    return rows + offset, cols, dist[rows, cols]
+
+
+def bounded_catchments(csr, sources, limit, n_jobs=None, chunk_size=64):
+    """
+    All (source, node, distance) triples with distance <= limit, one bounded
+    Dijkstra per source. Sources are processed in chunks (a dense chunk x
+    n_nodes block at a time) across forked worker processes that share the
+    graph copy-on-write.
+    Returns three arrays: source position, node row, distance.
+    """
+    global _CATCHMENT_GRAPH
+    import multiprocessing
+    import os
+    import numpy as np
+
+    sources = np.asarray(sources, dtype=np.int64)
+    tasks = [
+        (start, sources[start:start + chunk_size], limit)
+        for start in range(0, len(sources), chunk_size)
+    ]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(tasks))
+
+    _CATCHMENT_GRAPH = csr
+    try:
+        if n_jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context("fork").Pool(n_jobs) as pool:
+                parts = pool.map(_catchment_chunk, tasks)
+        else:
+            parts = [_catchment_chunk(t) for t in tasks]
+    finally:
+        _CATCHMENT_GRAPH = None
+
+    if not parts:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    return tuple(np.concatenate(p) for p in zip(*parts))
+
+
+def k_nearest_sources(csr, source_rows, k, limit):
+    """
+    Up to k nearest distinct sources per node within limit, in one sweep.
+
+    A Dijkstra over (distance, node, source) labels: a node accepts a label
+    unless it already holds that source or already has k labels. A source
+    outside a node's k nearest can't be among the k nearest of any node
+    reached through it, so full nodes stop propagating.
+    Memory is O(nodes * k) for the result, independent of the number of
+    sources.
+
+    Returns (labels, dists): (n_nodes, k) int32 source positions (-1 =
+    empty) and float32 distances, each row sorted by distance.
+    """
+    import heapq
+    import numpy as np
+
+    n = csr.shape[0]
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    weights = csr.data.tolist()
+
+    # Flat Python lists while sweeping; packed into arrays at the end
+    labels = [-1] * (n * k)
+    dists = [np.inf] * (n * k)
+    count = [0] * n
+    # Sources settled per node: at most k entries each
+    seen = [()] * n
+
+    heap = [(0.0, int(row), src) for src, row in enumerate(np.asarray(source_rows).tolist())]
+    heapq.heapify(heap)
+    push, pop = heapq.heappush, heapq.heappop
+
+    while heap:
+        d, v, src = pop(heap)
+        c = count[v]
+        if c == k or src in seen[v]:
+            continue
+        labels[v * k + c] = src
+        dists[v * k + c] = d
+        count[v] = c + 1
+        seen[v] = seen[v] + (src,)
+
+        for j in range(indptr[v], indptr[v + 1]):
+            w = indices[j]
+            nd = d + weights[j]
+            if nd <= limit and count[w] < k and src not in seen[w]:
+                push(heap, (nd, w, src))
+
+    return (
+        np.array(labels, dtype=np.int32).reshape(n, k),
+        np.array(dists, dtype=np.float32).reshape(n, k),
+    )
@@ -0,0 +1,313 @@
+"""
+Multi-city, multi-threshold batch runs of the network analysis.
+
+Every municipality gets its own directory under out_root with a
+checkpoint.json listing the stages that completed:
+
+    boundary       <slug>_boundary.gpkg (from the shared PDOK download)
+    parks          parks_<slug>.gpkg
+    buildings      buildings_<slug>.gpkg
+    graph          walk_graph.graphml
+    snap           snapped_buildings.gpkg + park_nodes.json
+    access_<t>m    buildings_park_access_<t>m.gpkg, one per threshold
+
+A stage is only marked done after its outputs are written, so re-running
+the same batch skips finished work and resumes an interrupted city at the
+first missing stage. Cities run in a process pool whose size is limited by
+the available memory.
+"""
+
+import json
+import os
+import time
+
+from .NA_instrumentation import configure_from_env, stage
+
+
+# -----------------------------------
+# Checkpoints
+# -----------------------------------
+class CityCheckpoint:
+    """
+    Completed stages of one city, persisted to <city_dir>/checkpoint.json.
+    """
+
+    def __init__(self, city_dir):
+        self.city_dir = city_dir
+        self.path = os.path.join(city_dir, "checkpoint.json")
+        self.state = {"stages": {}}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def done(self, name):
+        entry = self.state["stages"].get(name)
+        if entry is None:
+            return False
+        # Outputs deleted by hand invalidate the stage
+        return all(os.path.exists(os.path.join(self.city_dir, p)) for p in entry["outputs"])
+
+    def mark(self, name, outputs=(), **info):
+        self.state["stages"][name] = {
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "outputs": [os.path.relpath(p, self.city_dir) for p in outputs],
+            **info,
+        }
+        self.state.pop("error", None)
+        self._save()
+
+    def fail(self, error):
+        self.state["error"] = error
+        self._save()
+
+    def _save(self):
+        os.makedirs(self.city_dir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        # Atomic: an interrupted write never leaves a truncated checkpoint
+        os.replace(tmp, self.path)
+
+
+def _write_gpkg(gdf, path):
+    # Write next to the target and rename, so a killed worker never
+    # leaves a half-written file behind a completed checkpoint
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.partial{ext}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    gdf.to_file(tmp, driver="GPKG")
+    os.replace(tmp, path)
+
+
+# -----------------------------------
+# Concurrency
+# -----------------------------------
+def available_memory_gb():
+    """
+    Memory available for new work (MemAvailable on Linux), or None if unknown.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1e6
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1e9
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1e9
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def memory_aware_workers(n_jobs, worker_mem_gb=4.0, max_workers=None, available_gb=None):
+    """
+    Number of worker processes: at most one per job and per CPU, and no more
+    than fit in the available memory at worker_mem_gb each.
+    """
+    limit = max_workers or os.cpu_count() or 1
+    if available_gb is None:
+        available_gb = available_memory_gb()
+    if available_gb is not None and worker_mem_gb > 0:
+        limit = min(limit, int(available_gb // worker_mem_gb))
+    return max(1, min(limit, n_jobs))
+
+
+# -----------------------------------
+# Per-city pipeline
+# -----------------------------------
+def download_municipalities(out_root):
+    """
+    All PDOK municipality boundaries, downloaded once per batch and shared
+    by the workers.
+    """
+    import geopandas as gpd
+    from .NA_data_processing import AmsterdamBoundary
+
+    path = os.path.join(out_root, "gemeenten.gpkg")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(out_root, exist_ok=True)
+    boundary = AmsterdamBoundary()
+    gdf = boundary.to_geodataframe(boundary.download_data())
+    _write_gpkg(gpd.GeoDataFrame(gdf[["naam", "geometry"]], crs=gdf.crs), path)
+    return path
+
+
+def accessibility_for_thresholds(model, buildings_pts, park_nodes, thresholds):
+    """
+    One Dijkstra run up to the largest threshold, split into a result per
+    threshold with the same columns as compute_accessibility().
+    """
+    import numpy as np
+
+    full = model.compute_accessibility(
+        building_centroids_gdf=buildings_pts,
+        park_nodes=park_nodes,
+        max_distance=max(thresholds)
+    )
+    dist = full["dist_to_park_m"].to_numpy(dtype=float)
+
+    results = {}
+    for t in thresholds:
+        gdf = full[buildings_pts.columns].copy()
+        within = dist <= t
+        gdf["dist_to_park_m"] = np.where(within, dist, np.nan)
+        gdf[f"park_access_{t}m"] = within
+        results[t] = gdf
+    return results
+
+
+def run_city(municipality, thresholds, out_root, boundaries_path, target_crs="EPSG:28992", place=None):
+    """
+    Run (or resume) all stages of one municipality. Returns a summary dict;
+    failures are recorded in the checkpoint instead of raised, so one bad
+    city does not stop the batch.
+    """
+    import geopandas as gpd
+    import osmnx as ox
+    from .NA_analysis import ParkAccessibility
+    from .NA_data_processing import Buildings, ClipData, Parks, WalkingNetwork, city_data_paths, city_slug
+
+    slug = city_slug(municipality)
+    city_dir = os.path.join(out_root, slug)
+    os.makedirs(city_dir, exist_ok=True)
+    place = place or f"{municipality}, Netherlands"
+    paths = city_data_paths(city_dir, slug)
+    graph_path = os.path.join(city_dir, "walk_graph.graphml")
+    snapped_path = os.path.join(city_dir, "snapped_buildings.gpkg")
+    park_nodes_path = os.path.join(city_dir, "park_nodes.json")
+
+    ckpt = CityCheckpoint(city_dir)
+    ckpt.state["municipality"] = municipality
+    recorder = configure_from_env()
+    t0 = time.perf_counter()
+
+    try:
+        # -----------------------------------
+        # Inputs
+        # -----------------------------------
+        if ckpt.done("boundary"):
+            boundary = gpd.read_file(paths["boundary"])
+        else:
+            with stage("boundary"):
+                gemeenten = gpd.read_file(boundaries_path)
+                boundary = gemeenten[gemeenten["naam"] == municipality].dissolve()
+                if boundary.empty:
+                    raise ValueError(f"No municipality named {municipality!r} in the PDOK boundaries")
+                _write_gpkg(boundary, paths["boundary"])
+            ckpt.mark("boundary", [paths["boundary"]])
+
+        for name, loader in (("parks", Parks.get_parks), ("buildings", Buildings.get_buildings)):
+            if not ckpt.done(name):
+                with stage(f"download_{name}"):
+                    gdf = ClipData.clip_to_amsterdam(loader(place), boundary)
+                    _write_gpkg(gdf, paths[name])
+                ckpt.mark(name, [paths[name]], rows=len(gdf))
+                del gdf
+
+        graph = None
+        if not ckpt.done("graph"):
+            with stage("download_walk_network"):
+                graph = WalkingNetwork.get_graph(place)
+                ox.save_graphml(graph, graph_path + ".partial")
+                os.replace(graph_path + ".partial", graph_path)
+            ckpt.mark("graph", [graph_path], nodes=graph.number_of_nodes())
+
+        # -----------------------------------
+        # Analysis
+        # -----------------------------------
+        pending = [t for t in thresholds if not ckpt.done(f"access_{t}m")]
+        if pending:
+            if graph is None:
+                with stage("read_graph"):
+                    graph = ox.load_graphml(graph_path)
+            model = ParkAccessibility(target_crs=target_crs, graph=graph)
+            del graph
+
+            if ckpt.done("snap"):
+                with stage("read_snapped"):
+                    buildings_pts = gpd.read_file(snapped_path)
+                    with open(park_nodes_path, encoding="utf-8") as f:
+                        park_nodes = json.load(f)
+            else:
+                buildings_pts, park_nodes = model.generate_building_centroids_and_snap(
+                    gpd.read_file(paths["buildings"]),
+                    gpd.read_file(paths["parks"])
+                )
+                _write_gpkg(buildings_pts, snapped_path)
+                with open(park_nodes_path, "w", encoding="utf-8") as f:
+                    json.dump([int(n) for n in park_nodes], f)
+                ckpt.mark("snap", [snapped_path, park_nodes_path], park_nodes=len(park_nodes))
+
+            results = accessibility_for_thresholds(model, buildings_pts, park_nodes, pending)
+            for t, gdf in results.items():
+                out_path = os.path.join(city_dir, f"buildings_park_access_{t}m.gpkg")
+                with stage(f"write_access_{t}m"):
+                    _write_gpkg(gdf, out_path)
+                ckpt.mark(
+                    f"access_{t}m", [out_path],
+                    buildings=len(gdf),
+                    accessible=int(gdf[f"park_access_{t}m"].sum())
+                )
+    except Exception as e:
+        ckpt.fail(f"{type(e).__name__}: {e}")
+        return {"municipality": municipality, "status": "failed", "error": ckpt.state["error"]}
+    finally:
+        if recorder.enabled:
+            recorder.write_report(os.path.join(city_dir, "run_report.json"))
+
+    return {
+        "municipality": municipality,
+        "status": "done",
+        "computed": pending,
+        "seconds": round(time.perf_counter() - t0, 1),
+    }
+
+
+# -----------------------------------
+# Batch
+# -----------------------------------
+def run_batch(
+    municipalities,
+    thresholds=(1500,),
+    out_root="outputs/NA_batch",
+    target_crs="EPSG:28992",
+    worker_mem_gb=4.0,
+    max_workers=None
+):
+    """
+    Run every municipality in a process pool. Each worker process handles a
+    single city and then exits, so memory is returned between cities.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    thresholds = sorted({int(t) for t in thresholds})
+    boundaries_path = download_municipalities(out_root)
+    n_workers = memory_aware_workers(len(municipalities), worker_mem_gb, max_workers)
+    print(f"Running {len(municipalities)} municipalities x {thresholds} m with {n_workers} workers")
+
+    summary = []
+    with ProcessPoolExecutor(max_workers=n_workers, max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(run_city, name, thresholds, out_root, boundaries_path, target_crs): name
+            for name in municipalities
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # worker died (e.g. killed for memory)
+                result = {"municipality": futures[future], "status": "failed", "error": f"{type(e).__name__}: {e}"}
+            summary.append(result)
+            mark = "✅" if result["status"] == "done" else "❌"
+            print(f"{mark} {result['municipality']}: {result.get('error') or result.get('computed')}")
+
+    with open(os.path.join(out_root, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(sorted(summary, key=lambda r: r["municipality"]), f, indent=2)
+    return summary
@@ -1,10 +1,7 @@
-
-import requests
-import geopandas as gpd
-from shapely.geometry import shape
-import osmnx as ox
 import os
 
+from .NA_instrumentation import stage
+
 
 # ==================================================
 # Amsterdam Municipality Boundary
@@ -27,6 +24,8 @@ class AmsterdamBoundary:
         self.ams_boundary = None
 
     def download_data(self):
+        import requests
+
         response = requests.get(self.url, params=self.params)
         if response.status_code == 200:
             return response.json()
@@ -36,6 +35,9 @@ class AmsterdamBoundary:
             )
 
     def to_geodataframe(self, data_json):
+        import geopandas as gpd
+        from shapely.geometry import shape
+
         features = data_json["features"]
         geometries = [shape(f["geometry"]) for f in features]
         properties = [f["properties"] for f in features]
@@ -46,17 +48,91 @@ class AmsterdamBoundary:
 
         return self.gemeente_gdf
 
-    def filter_amsterdam(self):
+    def filter_municipality(self, name):
         if self.gemeente_gdf is None:
             raise RuntimeError("Run to_geodataframe() first")
 
-        ams = self.gemeente_gdf[self.gemeente_gdf["naam"] == "Amsterdam"]
+        municipality = self.gemeente_gdf[self.gemeente_gdf["naam"] == name]
+        if municipality.empty:
+            raise ValueError(f"No municipality named {name!r} in the PDOK boundaries")
 
         # Dissolve in case of multiple polygons
-        self.ams_boundary = ams.dissolve()
+        self.ams_boundary = municipality.dissolve()
 
         return self.ams_boundary
 
+    def filter_amsterdam(self):
+        return self.filter_municipality("Amsterdam")
+
+
+# ==================================================
+# Neighbourhoods and districts (CBS wijken en buurten)
+# ==================================================
+class AdministrativeAreas:
+    """
+    Download CBS neighbourhoods (buurten) or districts (wijken) of one
+    municipality from the PDOK WFS
+    """
+
+    LEVELS = {
+        "buurt": ("wijkenbuurten:buurten", "buurtcode", "buurtnaam"),
+        "wijk": ("wijkenbuurten:wijken", "wijkcode", "wijknaam"),
+    }
+
+    def __init__(self, level="buurt", municipality="Amsterdam", year=2023, page_size=1000):
+        if level not in self.LEVELS:
+            raise ValueError(f"level must be one of {sorted(self.LEVELS)}")
+        self.level = level
+        self.municipality = municipality
+        self.url = f"https://service.pdok.nl/cbs/wijkenbuurten/{year}/wfs/v1_0"
+        self.type_name, self.code_col, self.name_col = self.LEVELS[level]
+        self.page_size = page_size
+
+    def download_data(self):
+        import requests
+
+        fes = (
+            '<fes:Filter xmlns:fes="http://www.opengis.net/fes/2.0">'
+            "<fes:PropertyIsEqualTo><fes:ValueReference>gemeentenaam</fes:ValueReference>"
+            f"<fes:Literal>{self.municipality}</fes:Literal></fes:PropertyIsEqualTo></fes:Filter>"
+        )
+        features = []
+        # The WFS pages its results
+        while True:
+            params = {
+                "service": "WFS",
+                "request": "GetFeature",
+                "version": "2.0.0",
+                "typeNames": self.type_name,
+                "outputFormat": "application/json",
+                "filter": fes,
+                "count": self.page_size,
+                "startIndex": len(features),
+            }
+            response = requests.get(self.url, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to download WFS data (status {response.status_code})"
+                )
+            page = response.json().get("features", [])
+            features += page
+            if len(page) < self.page_size:
+                break
+        return {"type": "FeatureCollection", "features": features}
+
+    def to_geodataframe(self, data_json):
+        import geopandas as gpd
+        from shapely.geometry import shape
+
+        features = data_json["features"]
+        gdf = gpd.GeoDataFrame(
+            [f["properties"] for f in features],
+            geometry=[shape(f["geometry"]) for f in features],
+            crs="EPSG:28992"
+        )
+        gdf = gdf.rename(columns={self.code_col: "code", self.name_col: "name"})
+        return gdf[["code", "name", "geometry"]].to_crs(epsg=4326)
+
 
 # ==================================================
 # Parks
@@ -65,9 +141,11 @@ class Parks:
     """Download and process park polygons from OpenStreetMap"""
 
     @staticmethod
-    def get_parks():
+    def get_parks(place="Amsterdam, Netherlands"):
+        import osmnx as ox
+
         tags = {"leisure": "park"}
-        parks = ox.features_from_place("Amsterdam, Netherlands", tags=tags)
+        parks = ox.features_from_place(place, tags=tags)
 
         parks = parks[parks.geometry.type.isin(["Polygon", "MultiPolygon"])]
         parks = parks.to_crs(epsg=4326)
@@ -82,9 +160,11 @@ class Buildings:
     """Download and process building polygons from OpenStreetMap"""
 
     @staticmethod
-    def get_buildings():
+    def get_buildings(place="Amsterdam, Netherlands"):
+        import osmnx as ox
+
         tags = {"building": True}
-        buildings = ox.features_from_place("Amsterdam, Netherlands", tags=tags)
+        buildings = ox.features_from_place(place, tags=tags)
 
         buildings = buildings[buildings.geometry.type.isin(["Polygon", "MultiPolygon"])]
         buildings = buildings.to_crs(epsg=4326)
@@ -96,12 +176,19 @@ class Buildings:
 # Walking Network
 # ==================================================
 class WalkingNetwork:
-    """Download and process Amsterdam walking network"""
+    """Download and process a city walking network (Amsterdam by default)"""
+
+    @staticmethod
+    def get_graph(place="Amsterdam, Netherlands"):
+        import osmnx as ox
+
+        return ox.graph_from_place(place, network_type="walk")
 
     @staticmethod
-    def get_edges():
-        G = ox.graph_from_place("Amsterdam, Netherlands", network_type="walk")
-        
+    def get_edges(place="Amsterdam, Netherlands"):
+        import osmnx as ox
+
+        G = WalkingNetwork.get_graph(place)
 
         nodes, edges = ox.graph_to_gdfs(G)
         nodes = nodes.to_crs(epsg=4326)
@@ -118,51 +205,105 @@ class ClipData:
 
     @staticmethod
     def clip_to_amsterdam(gdf, ams_boundary):
+        import geopandas as gpd
+
         return gpd.clip(gdf, ams_boundary)
 
 
+def city_slug(municipality):
+    """
+    File-system friendly name, e.g. "'s-Hertogenbosch" -> "s_hertogenbosch".
+    """
+    import re
+    return re.sub(r"[^a-z0-9]+", "_", municipality.lower()).strip("_")
 
 
-def get_ams_data():
-    os.makedirs("outputs/NA_outputs", exist_ok=True)
+def city_data_paths(out_dir, tag):
+    return {
+        "boundary": os.path.join(out_dir, f"{tag}_boundary.gpkg"),
+        "parks": os.path.join(out_dir, f"parks_{tag}.gpkg"),
+        "buildings": os.path.join(out_dir, f"buildings_{tag}.gpkg"),
+        "walking_edges": os.path.join(out_dir, f"walking_edges_{tag}.gpkg"),
+        "walking_nodes": os.path.join(out_dir, f"walking_nodes_{tag}.gpkg"),
+    }
 
-    files = [
-        "outputs/NA_outputs/ams_boundary.gpkg",
-        "outputs/NA_outputs/parks_ams.gpkg",
-        "outputs/NA_outputs/buildings_ams.gpkg",
-        "outputs/NA_outputs/walking_edges_ams.gpkg",
-    ]
+
+def get_city_data(municipality, out_dir="outputs/NA_outputs", tag=None, place=None, force=False):
+    """
+    Boundary, parks, buildings and walking edges of one Dutch municipality,
+    read from out_dir when present and downloaded + clipped otherwise.
+    The municipality name must match the PDOK "naam" field; the OSM place
+    query defaults to "<municipality>, Netherlands".
+    """
+    import geopandas as gpd
+
+    os.makedirs(out_dir, exist_ok=True)
+    tag = tag or city_slug(municipality)
+    place = place or f"{municipality}, Netherlands"
+    paths = city_data_paths(out_dir, tag)
+    files = [paths["boundary"], paths["parks"], paths["buildings"], paths["walking_edges"]]
 
     # check if all files exist
-    if all(os.path.exists(f) for f in files):
-        ams_boundary = gpd.read_file(files[0])
-        parks_ams = gpd.read_file(files[1])
-        buildings_ams = gpd.read_file(files[2])
-        walking_edges_ams = gpd.read_file(files[3])
+    if not force and all(os.path.exists(f) for f in files):
+        with stage("read_gpkg"):
+            boundary_gdf = gpd.read_file(paths["boundary"])
+            parks_city = gpd.read_file(paths["parks"])
+            buildings_city = gpd.read_file(paths["buildings"])
+            walking_edges_city = gpd.read_file(paths["walking_edges"])
     else:
         # Download boundary
-        boundary = AmsterdamBoundary()
-        boundary_json = boundary.download_data()
-        ams_boundary = boundary.to_geodataframe(boundary_json)
-        ams_boundary = boundary.filter_amsterdam()
-        ams_boundary.to_file("outputs/NA_outputs/ams_boundary.gpkg")
+        with stage("download_boundary"):
+            boundary = AmsterdamBoundary()
+            boundary_json = boundary.download_data()
+            boundary.to_geodataframe(boundary_json)
+            boundary_gdf = boundary.filter_municipality(municipality)
+            boundary_gdf.to_file(paths["boundary"])
 
         # Download OSM data
-        parks = Parks.get_parks()
-        buildings = Buildings.get_buildings()
-        walking_graph, walking_nodes, walking_edges = WalkingNetwork.get_edges()
+        with stage("download_parks"):
+            parks = Parks.get_parks(place)
+        with stage("download_buildings"):
+            buildings = Buildings.get_buildings(place)
+        with stage("download_walk_network"):
+            walking_graph, walking_nodes, walking_edges = WalkingNetwork.get_edges(place)
 
         # Clip
-        parks_ams = ClipData.clip_to_amsterdam(parks, ams_boundary)
-        buildings_ams = ClipData.clip_to_amsterdam(buildings, ams_boundary)
-        # walking_graph_ams = ClipData.clip_to_amsterdam(walking_graph, ams_boundary)
-        walking_nodes_ams = ClipData.clip_to_amsterdam(walking_nodes, ams_boundary)
-        walking_edges_ams = ClipData.clip_to_amsterdam(walking_edges, ams_boundary)
+        with stage("clip"):
+            parks_city = ClipData.clip_to_amsterdam(parks, boundary_gdf)
+            buildings_city = ClipData.clip_to_amsterdam(buildings, boundary_gdf)
+            walking_nodes_city = ClipData.clip_to_amsterdam(walking_nodes, boundary_gdf)
+            walking_edges_city = ClipData.clip_to_amsterdam(walking_edges, boundary_gdf)
 
         # Save
-        parks_ams.to_file("outputs/NA_outputs/parks_ams.gpkg", driver="GPKG")
-        buildings_ams.to_file("outputs/NA_outputs/buildings_ams.gpkg", driver="GPKG")
-        walking_nodes_ams.to_file("outputs/NA_outputs/walking_nodes_ams.gpkg", driver="GPKG")
-        walking_edges_ams.to_file("outputs/NA_outputs/walking_edges_ams.gpkg", driver="GPKG")
+        with stage("write_gpkg"):
+            parks_city.to_file(paths["parks"], driver="GPKG")
+            buildings_city.to_file(paths["buildings"], driver="GPKG")
+            walking_nodes_city.to_file(paths["walking_nodes"], driver="GPKG")
+            walking_edges_city.to_file(paths["walking_edges"], driver="GPKG")
+
+    return boundary_gdf, parks_city, buildings_city, walking_edges_city
+
 
-    return ams_boundary, parks_ams, buildings_ams, walking_edges_ams
+def get_ams_data():
+    return get_city_data("Amsterdam", out_dir="outputs/NA_outputs", tag="ams")
+
+
+def get_area_data(municipality="Amsterdam", out_dir="outputs/NA_outputs", tag="ams", levels=("buurt", "wijk")):
+    """
+    {level: GeoDataFrame with code, name, geometry}, cached as
+    <level>_<tag>.gpkg in out_dir.
+    """
+    import geopandas as gpd
+
+    os.makedirs(out_dir, exist_ok=True)
+    areas = {}
+    for level in levels:
+        path = os.path.join(out_dir, f"{level}_{tag}.gpkg")
+        if os.path.exists(path):
+            areas[level] = gpd.read_file(path)
+            continue
+        with stage(f"download_{level}"):
+            source = AdministrativeAreas(level, municipality)
+            areas[level] = source.to_geodataframe(source.download_data())
+            areas[level].to_file(path, driver="GPKG")
+    return areas
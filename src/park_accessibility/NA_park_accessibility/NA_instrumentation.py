@@ -0,0 +1,207 @@
+"""
+Opt-in stage instrumentation for the network pipeline.
+
+Library code marks its stages with
+
+    with stage("dijkstra"):
+        ...
+
+Nothing is measured unless instrumentation is switched on, either with
+configure(enabled=True) or through the environment:
+
+    PARK_ACCESS_INSTRUMENT=1                         record stages
+    PARK_ACCESS_PROFILE_STAGES=dijkstra,snap_buildings  cProfile these stages
+    PARK_ACCESS_TRACE_MEMORY=0                       skip tracemalloc (faster)
+
+Per stage the recorder keeps wall time, CPU time, peak Python allocations
+(tracemalloc) and process RSS, and write_report() saves them as JSON.
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def _rss_mb():
+    """
+    Current resident set size in MB (Linux /proc, psutil elsewhere).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        return None
+
+
+def _max_rss_mb():
+    """
+    Peak resident set size of the process so far in MB.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return maxrss / 1e6 if sys.platform == "darwin" else maxrss / 1e3
+
+
+class StageRecorder:
+    def __init__(
+        self,
+        enabled=False,
+        trace_memory=True,
+        profile_stages=(),
+        profile_dir="outputs/NA_outputs/profiles"
+    ):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self.stages = []
+        self._stack = []
+        self._started = time.time()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._measure(name)
+
+    @contextlib.contextmanager
+    def _measure(self, name):
+        import tracemalloc
+
+        parent = self._stack[-1] if self._stack else None
+        frame = {"name": name, "child_peak": 0}
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            # reset_peak() is global: keep the enclosing stage's peak so far
+            if parent is not None:
+                parent["child_peak"] = max(parent["child_peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        profiler = None
+        if name in self.profile_stages:
+            import cProfile
+            profiler = cProfile.Profile()
+
+        path = "/".join([f["name"] for f in self._stack] + [name])
+        self._stack.append(frame)
+        rss_start = _rss_mb()
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - t0
+            cpu = time.process_time() - cpu0
+            self._stack.pop()
+
+            record = {
+                "name": name,
+                "path": path,
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "rss_start_mb": _round(rss_start),
+                "rss_end_mb": _round(_rss_mb()),
+                "max_rss_mb": _round(_max_rss_mb()),
+            }
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+                record["py_peak_mb"] = round(peak / 1e6, 3)
+                if parent is not None:
+                    parent["child_peak"] = max(parent["child_peak"], peak)
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                prof_path = os.path.join(self.profile_dir, f"{path.replace('/', '.')}.prof")
+                profiler.dump_stats(prof_path)
+                record["profile"] = prof_path
+
+            self.stages.append(record)
+
+    def report(self):
+        import platform
+
+        return {
+            "run": {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+                "argv": sys.argv,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "trace_memory": self.trace_memory,
+            },
+            "total_wall_s": round(sum(s["wall_s"] for s in self.stages if "/" not in s["path"]), 6),
+            "stages": self.stages,
+        }
+
+    def write_report(self, path="outputs/NA_outputs/run_report.json"):
+        import json
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def summary(self):
+        """
+        Top-level stages as aligned text lines, slowest first.
+        """
+        top = sorted((s for s in self.stages if "/" not in s["path"]), key=lambda s: -s["wall_s"])
+        return "\n".join(
+            f"{s['name']:<28} wall {s['wall_s']:9.2f} s  cpu {s['cpu_s']:9.2f} s  "
+            f"py peak {s.get('py_peak_mb', float('nan')):9.1f} MB  max rss {s['max_rss_mb'] or float('nan'):9.1f} MB"
+            for s in top
+        )
+
+
+def _round(value, ndigits=3):
+    return None if value is None else round(value, ndigits)
+
+
+# -----------------------------------
+# Process-wide recorder
+# -----------------------------------
+_recorder = StageRecorder(enabled=False)
+
+
+def configure(**kwargs):
+    """
+    Replace the process-wide recorder, e.g. configure(enabled=True).
+    """
+    global _recorder
+    _recorder = StageRecorder(**kwargs)
+    return _recorder
+
+
+def configure_from_env():
+    enabled = os.environ.get("PARK_ACCESS_INSTRUMENT", "0").lower() in ("1", "true", "yes")
+    profile = [s for s in os.environ.get("PARK_ACCESS_PROFILE_STAGES", "").split(",") if s]
+    trace = os.environ.get("PARK_ACCESS_TRACE_MEMORY", "1").lower() in ("1", "true", "yes")
+    return configure(enabled=enabled or bool(profile), trace_memory=trace, profile_stages=profile)
+
+
+def get_recorder():
+    return _recorder
+
+
+def stage(name):
+    """
+    Context manager that records one pipeline stage on the process-wide
+    recorder; a shared no-op when instrumentation is off.
+    """
+    return _recorder.stage(name)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import math
+import os
+
+# Web Mercator ground resolution at the equator for zoom 0 (meters per pixel)
+EQUATOR_M_PER_PX = 156543.03392804097
+METERS_PER_DEGREE = 111320.0
+
+
+def meters_per_pixel(zoom, lat=52.37):
+    """
+    Ground resolution of a 256 px web map tile at the given zoom and latitude.
+    """
+    return EQUATOR_M_PER_PX * math.cos(math.radians(lat)) / (2 ** zoom)
+
+
+def coordinate_decimals(zoom, lat=52.37):
+    """
+    Number of decimals for lon/lat coordinates so rounding stays below
+    half a pixel at the given zoom.
+    """
+    half_px_deg = meters_per_pixel(zoom, lat) / 2 / METERS_PER_DEGREE
+    return max(0, math.ceil(-math.log10(half_px_deg)))
+
+
+class MapLayerPreprocessor:
+    """
+    Prepare GeoDataFrames for Folium layers:
+    - keep only the properties the layer style/popup needs
+    - topology-preserving simplification with a tolerance of tolerance_px
+      pixels at detail_zoom (computed in a metric CRS)
+    - coordinates rounded to the precision that zoom can show
+
+    The resulting GeoJSON text is cached in memory and on disk, keyed by the
+    input geometries, properties and settings, so repeated renders are instant.
+    """
+
+    def __init__(
+        self,
+        detail_zoom=16,
+        tolerance_px=0.5,
+        metric_crs="EPSG:28992",
+        cache_dir="outputs/NA_outputs/cache"
+    ):
+        self.detail_zoom = detail_zoom
+        self.tolerance_px = tolerance_px
+        self.metric_crs = metric_crs
+        self.cache_dir = cache_dir
+        self._memory_cache = {}
+
+    def prepare(self, gdf, name, keep_columns=()):
+        """
+        Returns a GeoJSON FeatureCollection string for folium.GeoJson.
+        """
+        import shapely
+
+        keep_columns = [c for c in keep_columns if c in gdf.columns]
+        layer = gdf[keep_columns + [gdf.geometry.name]]
+
+        key = self._cache_key(layer, name)
+        if key in self._memory_cache:
+            return self._memory_cache[key]
+
+        cache_path = None
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"{name}_z{self.detail_zoom}_{key}.geojson")
+            if os.path.exists(cache_path):
+                with open(cache_path, encoding="utf-8") as f:
+                    text = f.read()
+                self._memory_cache[key] = text
+                return text
+
+        # Simplify in meters
+        layer = layer.to_crs(self.metric_crs)
+        lat = self._center_lat(layer)
+        tolerance = self.tolerance_px * meters_per_pixel(self.detail_zoom, lat)
+        layer = layer.set_geometry(
+            shapely.simplify(layer.geometry.to_numpy(), tolerance, preserve_topology=True),
+            crs=self.metric_crs
+        )
+        layer = layer[~layer.geometry.is_empty]
+
+        # Round lon/lat to what the zoom can show
+        layer = layer.to_crs(epsg=4326)
+        decimals = coordinate_decimals(self.detail_zoom, lat)
+        layer = layer.set_geometry(
+            shapely.transform(layer.geometry.to_numpy(), lambda c: c.round(decimals)),
+            crs=4326
+        )
+
+        text = layer.to_json(drop_id=True, separators=(",", ":"))
+        self._memory_cache[key] = text
+
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+        return text
+
+    def _center_lat(self, layer):
+        import geopandas as gpd
+
+        if layer.empty:
+            return 52.37
+        minx, miny, maxx, maxy = layer.total_bounds
+        center = gpd.points_from_xy([(minx + maxx) / 2], [(miny + maxy) / 2], crs=layer.crs)
+        return gpd.GeoSeries(center).to_crs(epsg=4326).iloc[0].y
+
+    def _cache_key(self, layer, name):
+        import shapely
+
+        h = hashlib.blake2b(digest_size=12)
+        h.update(json.dumps([
+            name, self.detail_zoom, self.tolerance_px, self.metric_crs,
+            str(layer.crs), list(layer.columns),
+        ]).encode("utf-8"))
+        for wkb in shapely.to_wkb(layer.geometry.to_numpy()):
+            h.update(wkb or b"")
+        for col in layer.columns:
+            if col != layer.geometry.name:
+                h.update(layer[col].astype(str).str.cat(sep="\x1f").encode("utf-8"))
+        return h.hexdigest()
@@ -0,0 +1,223 @@
+"""
+Walking profiles: declarative edge costs on one shared graph topology.
+
+A profile turns edge length into a cost in "effective meters", so the
+usual thresholds (e.g. 1500 m) keep their meaning:
+
+    cost = length * length_factor * highway_factors[highway]
+           + crossing_penalty_m   (edges ending at a crossing node)
+
+A highway factor of None removes those edges for the profile (e.g. steps
+for a step-free profile). GraphTopology stores the CSR structure of the
+walk graph once; each profile only adds one float array of costs aligned
+with it.
+"""
+
+import numpy as np
+
+CROSSING_NODE_TAGS = ("crossing",)
+
+
+class WalkingProfile:
+    def __init__(
+        self,
+        name,
+        length_factor=1.0,
+        highway_factors=None,
+        crossing_penalty_m=0.0
+    ):
+        self.name = name
+        self.length_factor = length_factor
+        self.highway_factors = dict(highway_factors or {})
+        self.crossing_penalty_m = crossing_penalty_m
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a profile from plain data, e.g. parsed from JSON:
+        {"name": "slow", "length_factor": 1.4, "highway_factors": {"steps": 2}}
+        """
+        return cls(**data)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "length_factor": self.length_factor,
+            "highway_factors": self.highway_factors,
+            "crossing_penalty_m": self.crossing_penalty_m,
+        }
+
+    def edge_costs(self, length, highway_codes, highway_names, crossing):
+        """
+        Vectorized cost of every edge; np.inf marks edges the profile removes.
+        """
+        factors = np.array([
+            np.inf if self.highway_factors.get(h, 1.0) is None else self.highway_factors.get(h, 1.0)
+            for h in highway_names
+        ], dtype=float)
+        cost = length * (self.length_factor * factors[highway_codes])
+        if self.crossing_penalty_m:
+            cost = cost + np.where(crossing, self.crossing_penalty_m, 0.0)
+        return cost
+
+    def __repr__(self):
+        return f"WalkingProfile({self.name!r})"
+
+
+_BUSY_ROADS = {
+    "trunk": 2.0, "trunk_link": 2.0,
+    "primary": 1.5, "primary_link": 1.5,
+    "secondary": 1.3, "secondary_link": 1.3,
+}
+
+PROFILES = {
+    # Plain network distance, identical to the "length" weight
+    "default": WalkingProfile("default"),
+    # ~3.5 km/h instead of ~5 km/h: the same time budget covers less ground
+    "slow": WalkingProfile("slow", length_factor=1.4),
+    "avoid_busy_roads": WalkingProfile("avoid_busy_roads", highway_factors=_BUSY_ROADS, crossing_penalty_m=30.0),
+    "step_free": WalkingProfile("step_free", highway_factors={"steps": None}),
+}
+
+
+def resolve_profile(profile):
+    """
+    Accept a WalkingProfile, a PROFILES key or a dict for from_dict().
+    """
+    if isinstance(profile, WalkingProfile):
+        return profile
+    if isinstance(profile, dict):
+        return WalkingProfile.from_dict(profile)
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown walking profile {profile!r}; known: {sorted(PROFILES)}") from None
+
+
+# -----------------------------------
+# Shared topology
+# -----------------------------------
+class GraphTopology:
+    """
+    CSR structure (indptr, indices) of a walk graph plus the per-edge
+    attributes profiles need. Parallel edges share one CSR slot; each
+    profile keeps the cheapest of them.
+    """
+
+    def __init__(self, G, weight="length"):
+        self.node_ids = np.fromiter(G.nodes, dtype=np.int64, count=G.number_of_nodes())
+        self.node_index = {n: i for i, n in enumerate(self.node_ids.tolist())}
+        n = len(self.node_ids)
+
+        # Slim graphs (NA_analysis.slim_graph) flag crossings and store
+        # highway codes plus the cheapest edge per highway of parallel edges
+        crossing_nodes = {
+            node for node, data in G.nodes(data=True)
+            if data.get("crossing") or data.get("highway") in CROSSING_NODE_TAGS
+        }
+        highway_names = G.graph.get("highway_names")
+
+        u, v, length, highway = [], [], [], []
+        index = self.node_index
+        for a, b, data in G.edges(data=True):
+            parallel = data.get("parallel")
+            if parallel is None:
+                edges = ((data.get("highway", ""), data.get(weight, 1.0)),)
+            else:
+                edges = parallel.items()
+            for hw, w in edges:
+                if highway_names is not None:
+                    hw = highway_names[hw]
+                u.append(index[a])
+                v.append(index[b])
+                length.append(w)
+                # Simplified edges may carry several highway values
+                highway.append(hw[0] if isinstance(hw, list) else hw)
+
+        if not G.is_directed():
+            # Undirected (slim) graphs: every edge is walkable both ways
+            u, v = u + v, v + u
+            length = length + length
+            highway = highway + highway
+
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        self.length = np.asarray(length, dtype=float)
+        self.highway_names, self.highway_codes = np.unique(np.asarray(highway, dtype=str), return_inverse=True)
+        self.crossing = np.isin(v, [index[c] for c in crossing_nodes])
+
+        # Sort raw edges by (u, v): consecutive runs become one CSR slot
+        order = np.lexsort((v, u))
+        self._order = order
+        us, vs = u[order], v[order]
+        first = np.ones(len(us), dtype=bool)
+        first[1:] = (us[1:] != us[:-1]) | (vs[1:] != vs[:-1])
+        self._slot_starts = np.flatnonzero(first)
+
+        # One index dtype for both arrays, so scipy never copies them
+        idx_dtype = np.int32 if max(n, len(self._slot_starts)) < 2**31 - 1 else np.int64
+        self.indices = vs[first].astype(idx_dtype)
+        self.indptr = np.zeros(n + 1, dtype=idx_dtype)
+        np.cumsum(np.bincount(us[first], minlength=n), out=self.indptr[1:])
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    def costs(self, profile):
+        """
+        One float per CSR slot: the cheapest parallel edge under profile.
+        """
+        profile = resolve_profile(profile)
+        cost = profile.edge_costs(self.length, self.highway_codes, self.highway_names, self.crossing)
+        if len(cost) == 0:
+            return cost
+        return np.minimum.reduceat(cost[self._order], self._slot_starts)
+
+    def csr(self, profile="default", data=None):
+        """
+        CSR matrix of profile costs; indptr/indices are shared, not copied.
+        """
+        import scipy.sparse as sp
+
+        if data is None:
+            data = self.costs(profile)
+        n = self.n_nodes
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=(n, n), copy=False)
+
+    def rows(self, nodes):
+        return np.array([self.node_index[n] for n in np.asarray(nodes).tolist()], dtype=np.int64)
+
+    def multi_profile_distances(self, source_rows, profiles, limit):
+        """
+        Distance from the nearest source to every node, per profile:
+        {profile name: float array (np.inf = beyond limit)}.
+
+        All profiles run in one Dijkstra call on a block-diagonal graph:
+        block p is the topology with profile p's costs and its node rows
+        offset by p * n_nodes, and the sources are repeated per block. The
+        blocks are disconnected, so each one only sees its own sources. The
+        stacked indptr/indices are temporary; a single profile uses the
+        shared arrays directly.
+        """
+        import scipy.sparse as sp
+        from scipy.sparse.csgraph import dijkstra
+
+        profiles = [resolve_profile(p) for p in profiles]
+        n, m, k = self.n_nodes, len(self.indices), len(profiles)
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+
+        if k == 1:
+            graph = self.csr(profiles[0])
+            sources = source_rows
+        else:
+            idx_dtype = np.int32 if k * max(n, m) < 2**31 - 1 else np.int64
+            block = np.arange(k, dtype=idx_dtype)[:, None]
+            indptr = np.append((self.indptr[:-1].astype(idx_dtype) + block * m).ravel(), idx_dtype(k * m))
+            indices = (self.indices.astype(idx_dtype) + block * n).ravel()
+            data = np.concatenate([self.costs(p) for p in profiles])
+            graph = sp.csr_matrix((data, indices, indptr), shape=(k * n, k * n), copy=False)
+            sources = (source_rows + block * n).ravel()
+
+        dist = dijkstra(graph, directed=True, indices=sources, min_only=True, limit=limit)
+        return {profile.name: dist[p * n:(p + 1) * n] for p, profile in enumerate(profiles)}
@@ -0,0 +1,258 @@
+import os
+
+from ..kd_park_accessibility.geo import scanline_mask
+
+NODATA = -9999.0
+
+
+class AccessibilityRaster:
+    """
+    Accessibility surface on a regular grid in a metric CRS.
+
+    values: 2D float32 array (row 0 is the northern edge), NaN = no data
+    origin: (minx, maxy) of the grid in crs units (meters)
+    """
+
+    def __init__(self, values, origin, cell_size, crs="EPSG:28992"):
+        self.values = values
+        self.origin = origin
+        self.cell_size = cell_size
+        self.crs = crs
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def bounds(self):
+        minx, maxy = self.origin
+        rows, cols = self.values.shape
+        return minx, maxy - rows * self.cell_size, minx + cols * self.cell_size, maxy
+
+    # -----------------------------------
+    # Builders
+    # -----------------------------------
+    @classmethod
+    def from_buildings(
+        cls,
+        buildings_gdf,
+        cell_size=10,
+        value_col="dist_to_park_m",
+        boundary_gdf=None,
+        crs="EPSG:28992",
+        unreachable_distance=2000
+    ):
+        """
+        Bin building points (e.g. network distances from compute_accessibility)
+        onto the grid, keeping the minimum value per cell.
+        Buildings without a value are treated as unreachable_distance.
+        """
+        import numpy as np
+
+        buildings = buildings_gdf.to_crs(crs)
+        x = buildings.geometry.x.to_numpy()
+        y = buildings.geometry.y.to_numpy()
+        values = buildings[value_col].to_numpy(dtype=float)
+        values = np.where(np.isnan(values), unreachable_distance, values)
+
+        extent = boundary_gdf.to_crs(crs).total_bounds if boundary_gdf is not None else buildings.total_bounds
+        origin, shape = _grid_for_bounds(extent, cell_size)
+
+        col = np.floor((x - origin[0]) / cell_size).astype(np.int64)
+        row = np.floor((origin[1] - y) / cell_size).astype(np.int64)
+        inside = (row >= 0) & (row < shape[0]) & (col >= 0) & (col < shape[1])
+
+        grid = np.full(shape[0] * shape[1], np.inf, dtype=np.float32)
+        np.minimum.at(grid, row[inside] * shape[1] + col[inside], values[inside].astype(np.float32))
+        grid[np.isinf(grid)] = np.nan
+
+        return cls(grid.reshape(shape), origin, cell_size, crs)
+
+    @classmethod
+    def euclidean_from_parks(
+        cls,
+        park_gdf,
+        boundary_gdf,
+        cell_size=10,
+        crs="EPSG:28992",
+        use_centroids=False
+    ):
+        """
+        Straight-line distance from every cell to the nearest park, computed
+        with a Euclidean distance transform over a rasterized park mask.
+        use_centroids=True measures to park centroids, matching the KD-tree
+        approach; otherwise distances are to the park polygons.
+        """
+        import numpy as np
+        from scipy.ndimage import distance_transform_edt
+
+        parks = park_gdf.to_crs(crs)
+        boundary = boundary_gdf.to_crs(crs)
+        origin, shape = _grid_for_bounds(boundary.total_bounds, cell_size)
+
+        if use_centroids:
+            c = parks.geometry.centroid
+            col = np.floor((c.x.to_numpy() - origin[0]) / cell_size).astype(np.int64)
+            row = np.floor((origin[1] - c.y.to_numpy()) / cell_size).astype(np.int64)
+            inside = (row >= 0) & (row < shape[0]) & (col >= 0) & (col < shape[1])
+            park_mask = np.zeros(shape, dtype=bool)
+            park_mask[row[inside], col[inside]] = True
+        else:
+            park_mask = rasterize_polygons(parks.geometry.union_all(), origin, cell_size, shape)
+
+        if not park_mask.any():
+            raise ValueError("No park cells inside the raster extent")
+
+        dist = distance_transform_edt(~park_mask, sampling=cell_size).astype(np.float32)
+
+        inside_boundary = rasterize_polygons(boundary.geometry.union_all(), origin, cell_size, shape)
+        dist[~inside_boundary] = np.nan
+
+        return cls(dist, origin, cell_size, crs)
+
+    # -----------------------------------
+    # Outputs
+    # -----------------------------------
+    def write_bil(self, path):
+        """
+        Write a georeferenced ESRI BIL raster (.bil + .hdr + .prj), readable
+        by GDAL/QGIS without extra dependencies.
+        """
+        import numpy as np
+        from pyproj import CRS
+        from pyproj.enums import WktVersion
+
+        base, _ = os.path.splitext(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        rows, cols = self.values.shape
+        data = np.where(np.isnan(self.values), NODATA, self.values).astype("<f4")
+        data.tofile(base + ".bil")
+
+        minx, maxy = self.origin
+        header = {
+            "BYTEORDER": "I",
+            "LAYOUT": "BIL",
+            "NROWS": rows,
+            "NCOLS": cols,
+            "NBANDS": 1,
+            "NBITS": 32,
+            "PIXELTYPE": "FLOAT",
+            "ULXMAP": minx + self.cell_size / 2,
+            "ULYMAP": maxy - self.cell_size / 2,
+            "XDIM": self.cell_size,
+            "YDIM": self.cell_size,
+            "NODATA": NODATA,
+        }
+        with open(base + ".hdr", "w") as f:
+            f.writelines(f"{k:<14} {v}\n" for k, v in header.items())
+        with open(base + ".prj", "w") as f:
+            f.write(CRS.from_user_input(self.crs).to_wkt(WktVersion.WKT1_ESRI))
+
+        return base + ".bil"
+
+    def write_png_overlay(self, path, vmax=1500, cmap="RdYlGn_r", chunk_rows=512):
+        """
+        Resample the surface to a Web Mercator aligned grid and save it as an
+        RGBA PNG for folium.raster_layers.ImageOverlay.
+        Returns the overlay bounds [[south, west], [north, east]].
+        """
+        import numpy as np
+        import matplotlib
+        import matplotlib.pyplot as plt
+        from pyproj import Transformer
+
+        to_merc = Transformer.from_crs(self.crs, "EPSG:3857", always_xy=True)
+        from_merc = Transformer.from_crs("EPSG:3857", self.crs, always_xy=True)
+        to_wgs = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+
+        rows, cols = self.values.shape
+        if rows < 2 or cols < 2:
+            raise ValueError("Raster is too small for an overlay")
+
+        minx, miny, maxx, maxy = self.bounds
+        mx0, my0, mx1, my1 = to_merc.transform_bounds(minx, miny, maxx, maxy)
+        colormap = matplotlib.colormaps[cmap]
+
+        # The Web Mercator -> raster CRS mapping is smooth, so transform a
+        # coarse lattice of pixel centers and interpolate bilinearly between them
+        step = 32
+        lattice_r = np.unique(np.r_[np.arange(0, rows, step), rows - 1])
+        lattice_c = np.unique(np.r_[np.arange(0, cols, step), cols - 1])
+        lx = mx0 + (lattice_c + 0.5) * (mx1 - mx0) / cols
+        ly = my1 - (lattice_r + 0.5) * (my1 - my0) / rows
+        sx, sy = from_merc.transform(*np.meshgrid(lx, ly))
+
+        all_cols = np.arange(cols)
+        sx_rows = np.array([np.interp(all_cols, lattice_c, v) for v in sx])
+        sy_rows = np.array([np.interp(all_cols, lattice_c, v) for v in sy])
+
+        rgba = np.zeros((rows, cols, 4), dtype=np.uint8)
+        for r0 in range(0, rows, chunk_rows):
+            r = np.arange(r0, min(r0 + chunk_rows, rows))
+            k = np.clip(np.searchsorted(lattice_r, r, side="right") - 1, 0, len(lattice_r) - 2)
+            span = np.maximum(lattice_r[k + 1] - lattice_r[k], 1)
+            w = ((r - lattice_r[k]) / span)[:, None]
+            px = sx_rows[k] * (1 - w) + sx_rows[k + 1] * w
+            py = sy_rows[k] * (1 - w) + sy_rows[k + 1] * w
+
+            col = np.floor((px - minx) / self.cell_size).astype(np.int64)
+            row = np.floor((maxy - py) / self.cell_size).astype(np.int64)
+            valid = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+
+            sample = np.full(px.shape, np.nan, dtype=np.float32)
+            sample[valid] = self.values[row[valid], col[valid]]
+
+            chunk = colormap(np.clip(sample / vmax, 0, 1), bytes=True)
+            chunk[np.isnan(sample), 3] = 0
+            rgba[r.min():r.max() + 1] = chunk
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        plt.imsave(path, rgba, pil_kwargs={"compress_level": 3})
+
+        west, south = to_wgs.transform(mx0, my0)
+        east, north = to_wgs.transform(mx1, my1)
+        return [[south, west], [north, east]]
+
+    def add_to_map(self, m, png_path, name="Accessibility surface", vmax=1500, opacity=0.6):
+        """
+        Add the surface to a Folium map as an image layer.
+        """
+        import folium
+
+        bounds = self.write_png_overlay(png_path, vmax=vmax)
+        folium.raster_layers.ImageOverlay(
+            image=png_path,
+            bounds=bounds,
+            name=name,
+            opacity=opacity,
+        ).add_to(m)
+        return m
+
+
+# -----------------------------------
+# Grid helpers
+# -----------------------------------
+def _grid_for_bounds(bounds, cell_size):
+    import math
+
+    minx, miny, maxx, maxy = bounds
+    minx = math.floor(minx / cell_size) * cell_size
+    maxy = math.ceil(maxy / cell_size) * cell_size
+    cols = max(1, math.ceil((maxx - minx) / cell_size))
+    rows = max(1, math.ceil((maxy - miny) / cell_size))
+    return (minx, maxy), (rows, cols)
+
+
+def rasterize_polygons(geometry, origin, cell_size, shape):
+    """
+    Scanline (even-odd) rasterization of a (multi)polygon: a cell is set
+    when its center lies inside.
+    """
+    import shapely
+
+    rings = shapely.get_rings(shapely.get_parts(geometry))
+    return scanline_mask(
+        [shapely.get_coordinates(r) for r in rings],
+        origin, cell_size, shape
+    )
@@ -0,0 +1,255 @@
+"""
+Out-of-core, tiled network accessibility for national-scale runs.
+
+The study area is cut into square tiles in the metric CRS. For each tile:
+- buildings whose centroid lies in the tile core are read from the GPKG
+  with a bbox filter (each building belongs to exactly one tile)
+- the walk graph is loaded for the core plus a halo of max_distance,
+  which contains every path of length <= max_distance that starts in
+  the core; parks are kept when their centroid lies in the halo (parks
+  are snapped by centroid, as in the whole-city run)
+- distances come from a bounded multi-source Dijkstra on that subgraph
+
+Results are streamed to a Hive-style partitioned directory of .npy columns
+
+    <out_dir>/tile_x=<i>/tile_y=<j>/{building_fid,x,y,nearest_node,dist_to_park_m,park_access}.npy
+    <out_dir>/manifest.json
+
+so peak memory depends on the tile size, not on the size of the country.
+Tiles already listed in the manifest are skipped when a run is restarted;
+the manifest also records the run parameters, and a restart with different
+ones is refused instead of mixing partitions.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .NA_instrumentation import stage
+
+COLUMNS = ("building_fid", "x", "y", "nearest_node", "dist_to_park_m", "park_access")
+
+
+def osm_walk_graph(bbox):
+    """
+    Default graph loader: OSM walk network for (west, south, east, north).
+    """
+    import osmnx as ox
+    return ox.graph_from_bbox(bbox, network_type="walk", retain_all=True, truncate_by_edge=True)
+
+
+class TiledAccessibility:
+    def __init__(
+        self,
+        buildings_path,
+        parks_path,
+        out_dir="outputs/NA_outputs/tiled",
+        tile_size_m=10_000,
+        max_distance=1500,
+        target_crs="EPSG:28992",
+        graph_loader=osm_walk_graph,
+        profile="default"
+    ):
+        """
+        buildings_path / parks_path: vector files readable with a bbox filter
+        (GPKG). graph_loader(bbox) returns the walk graph for a
+        (west, south, east, north) EPSG:4326 box.
+        """
+        self.buildings_path = buildings_path
+        self.parks_path = parks_path
+        self.out_dir = out_dir
+        self.tile_size_m = tile_size_m
+        self.max_distance = max_distance
+        self.target_crs = target_crs
+        self.graph_loader = graph_loader
+        self.profile = profile
+
+    # -----------------------------------
+    # Tiling
+    # -----------------------------------
+    def tiles(self, bounds=None):
+        """
+        (i, j, (minx, miny, maxx, maxy)) core boxes in the target CRS that
+        cover bounds (default: extent of the buildings file).
+        """
+        import math
+
+        if bounds is None:
+            bounds = self._file_bounds(self.buildings_path)
+        minx, miny, maxx, maxy = bounds
+        size = self.tile_size_m
+        for i in range(math.floor(minx / size), math.floor(maxx / size) + 1):
+            for j in range(math.floor(miny / size), math.floor(maxy / size) + 1):
+                yield i, j, (i * size, j * size, (i + 1) * size, (j + 1) * size)
+
+    def _file_bounds(self, path):
+        import pyogrio
+        from pyproj import Transformer
+
+        info = pyogrio.read_info(path)
+        to_target = Transformer.from_crs(info["crs"], self.target_crs, always_xy=True)
+        return to_target.transform_bounds(*info["total_bounds"])
+
+    def _read_bbox(self, path, box):
+        """
+        Features of path intersecting a target-CRS box, in the target CRS,
+        indexed by feature id.
+        """
+        import geopandas as gpd
+        import pyogrio
+        from pyproj import Transformer
+
+        file_crs = pyogrio.read_info(path)["crs"]
+        to_file = Transformer.from_crs(self.target_crs, file_crs, always_xy=True)
+        gdf = gpd.read_file(path, bbox=to_file.transform_bounds(*box), fid_as_index=True)
+        return gdf.to_crs(self.target_crs)
+
+    # -----------------------------------
+    # Run
+    # -----------------------------------
+    def run(self, bounds=None):
+        """
+        Process every tile that is not in the manifest yet. Returns the
+        manifest dict.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        manifest = self._load_manifest()
+
+        for i, j, core in self.tiles(bounds):
+            key = f"tile_x={i}/tile_y={j}"
+            if key in manifest["tiles"]:
+                continue
+            with stage(f"tile_{i}_{j}"):
+                rows = self._run_tile(i, j, core)
+            manifest["tiles"][key] = {"bounds": core, "rows": rows}
+            self._save_manifest(manifest)
+            if rows:
+                print(f"✅ {key}: {rows} buildings")
+
+        return manifest
+
+    def _run_tile(self, i, j, core):
+        from pyproj import Transformer
+        from .NA_analysis import ParkAccessibility
+
+        minx, miny, maxx, maxy = core
+        halo = (minx - self.max_distance, miny - self.max_distance,
+                maxx + self.max_distance, maxy + self.max_distance)
+
+        buildings = self._read_bbox(self.buildings_path, core)
+        if buildings.empty:
+            return 0
+        # Assign each building to the tile holding its centroid
+        centroids = buildings.geometry.centroid
+        in_core = (
+            (centroids.x >= minx) & (centroids.x < maxx) &
+            (centroids.y >= miny) & (centroids.y < maxy)
+        ).to_numpy()
+        buildings = buildings[in_core]
+        if buildings.empty:
+            return 0
+
+        # A large park can reach into the halo while its centroid (where it
+        # is snapped) lies far outside; such parks would be snapped to the
+        # wrong node here
+        parks = self._read_bbox(self.parks_path, halo)
+        park_centroids = parks.geometry.centroid
+        parks = parks[(
+            (park_centroids.x >= halo[0]) & (park_centroids.x <= halo[2]) &
+            (park_centroids.y >= halo[1]) & (park_centroids.y <= halo[3])
+        ).to_numpy()]
+        to_wgs = Transformer.from_crs(self.target_crs, "EPSG:4326", always_xy=True)
+        graph = self.graph_loader(to_wgs.transform_bounds(*halo))
+
+        model = ParkAccessibility(target_crs=self.target_crs, graph=graph)
+        del graph
+        buildings_pts, park_nodes = model.generate_building_centroids_and_snap(buildings, parks)
+
+        topology = model.topology()
+        dist = np.full(len(buildings_pts), np.inf)
+        if len(park_nodes):
+            node_dist = topology.multi_profile_distances(
+                topology.rows(park_nodes), [self.profile], self.max_distance
+            )
+            dist = next(iter(node_dist.values()))[topology.rows(buildings_pts["nearest_node"])]
+
+        reached = np.isfinite(dist)
+        self._write_partition(i, j, {
+            "building_fid": buildings_pts.index.to_numpy(dtype=np.int64),
+            "x": buildings_pts.geometry.x.to_numpy(),
+            "y": buildings_pts.geometry.y.to_numpy(),
+            "nearest_node": buildings_pts["nearest_node"].to_numpy(dtype=np.int64),
+            "dist_to_park_m": np.where(reached, dist, np.nan).astype(np.float32),
+            "park_access": reached,
+        })
+        return len(buildings_pts)
+
+    # -----------------------------------
+    # Output
+    # -----------------------------------
+    def _write_partition(self, i, j, columns):
+        final = os.path.join(self.out_dir, f"tile_x={i}", f"tile_y={j}")
+        tmp = final + ".partial"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+
+    def _parameters(self):
+        from .NA_profiles import resolve_profile
+
+        return {
+            "tile_size_m": self.tile_size_m,
+            "max_distance": self.max_distance,
+            "halo_m": self.max_distance,
+            "crs": self.target_crs,
+            "profile": resolve_profile(self.profile).to_dict(),
+            "columns": list(COLUMNS),
+        }
+
+    def _load_manifest(self):
+        path = os.path.join(self.out_dir, "manifest.json")
+        parameters = self._parameters()
+        if not os.path.exists(path):
+            return {**parameters, "tiles": {}}
+
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        changed = sorted(k for k, v in parameters.items() if manifest.get(k) != v)
+        if changed:
+            raise ValueError(
+                f"{self.out_dir} holds tiles computed with different {', '.join(changed)}; "
+                "use another out_dir or remove it to start fresh"
+            )
+        return manifest
+
+    def _save_manifest(self, manifest):
+        path = os.path.join(self.out_dir, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def load_tiled_results(out_dir, columns=COLUMNS):
+    """
+    Concatenate the partitions listed in the manifest into one array per
+    column (partitions are memory-mapped while reading).
+    """
+    with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    parts = {name: [] for name in columns}
+    for key, tile in manifest["tiles"].items():
+        if not tile["rows"]:
+            continue
+        for name in columns:
+            parts[name].append(np.load(os.path.join(out_dir, key, f"{name}.npy"), mmap_mode="r"))
+
+    return {
+        name: np.concatenate(arrays) if arrays else np.empty(0)
+        for name, arrays in parts.items()
+    }
@@ -0,0 +1,250 @@
+import gzip
+import json
+import re
+
+from ..kd_park_accessibility.tiles import (
+    TileArchiveWriter,
+    WEB_MERCATOR_ORIGIN,
+    tile_span_m,
+)
+
+_TRAILING_ZERO = re.compile(r"\.0(?=[,\]])")
+
+
+class TilePyramidExporter:
+    """
+    Export accessibility results, walking edges and parks as an XYZ tile
+    pyramid packed into a single archive (see kd_park_accessibility.tiles).
+
+    Each tile is gzip-compressed JSON keyed by layer name, with coordinates in
+    tile-local integer units (0..extent, y pointing down). Per zoom level:
+    - streets and parks are simplified with a tolerance of tolerance_px pixels
+    - buildings are thinned to one point per pixel and distance class
+    - attributes are only kept from detail_zoom upwards
+    """
+
+    def __init__(
+        self,
+        min_zoom=11,
+        max_zoom=16,
+        detail_zoom=15,
+        extent=4096,
+        buffer=64,
+        tolerance_px=0.5,
+        tile_px=256
+    ):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.detail_zoom = detail_zoom
+        self.extent = extent
+        self.buffer = buffer
+        self.tolerance_px = tolerance_px
+        self.tile_px = tile_px
+
+    # -----------------------------------
+    # Export
+    # -----------------------------------
+    def export(
+        self,
+        buildings_gdf,
+        street_gdf,
+        park_gdf,
+        out_path="outputs/NA_outputs/park_tiles.pkt",
+        max_distance=1500
+    ):
+        import numpy as np
+        from .NA_visualization import DISTANCE_CLASS_COLORS, distance_classes
+
+        buildings = buildings_gdf.to_crs(epsg=3857)
+        streets = street_gdf.to_crs(epsg=3857)
+        parks = park_gdf.to_crs(epsg=3857)
+
+        access_col = f"park_access_{max_distance}m"
+        building_xy = np.column_stack([buildings.geometry.x.to_numpy(), buildings.geometry.y.to_numpy()])
+        building_cls = distance_classes(buildings["dist_to_park_m"], buildings[access_col])
+        building_dist = buildings["dist_to_park_m"].to_numpy(dtype=float)
+
+        street_geoms = streets.geometry.to_numpy()
+        street_highway = _first_value(streets["highway"]) if "highway" in streets else None
+        park_geoms = parks.geometry.to_numpy()
+        park_names = parks["name"].to_numpy(dtype=object) if "name" in parks else None
+
+        bounds = np.array([
+            buildings.total_bounds,
+            streets.total_bounds,
+            parks.total_bounds,
+        ])
+        total_bounds = (
+            np.nanmin(bounds[:, 0]), np.nanmin(bounds[:, 1]),
+            np.nanmax(bounds[:, 2]), np.nanmax(bounds[:, 3]),
+        )
+
+        metadata = {
+            "format": "json",
+            "encoding": "gzip",
+            "min_zoom": self.min_zoom,
+            "max_zoom": self.max_zoom,
+            "extent": self.extent,
+            "bounds_3857": [float(v) for v in total_bounds],
+            "layers": ["parks", "streets", "buildings"],
+            "building_colors": list(DISTANCE_CLASS_COLORS),
+        }
+
+        n_tiles = 0
+        with TileArchiveWriter(out_path, metadata) as writer:
+            for z in range(self.min_zoom, self.max_zoom + 1):
+                detailed = z >= self.detail_zoom
+
+                tiles = {}
+                self._add_shape_layer(
+                    tiles, z, "parks", park_geoms, total_bounds,
+                    props=park_names if detailed else None, prop_name="name"
+                )
+                self._add_shape_layer(
+                    tiles, z, "streets", street_geoms, total_bounds,
+                    props=street_highway if detailed else None, prop_name="highway"
+                )
+                self._add_point_layer(
+                    tiles, z, building_xy, building_cls,
+                    building_dist if detailed else None
+                )
+
+                for (x, y), layers in tiles.items():
+                    payload = "{" + ",".join(f'"{name}":{body}' for name, body in layers.items()) + "}"
+                    writer.add(z, x, y, gzip.compress(payload.encode("utf-8"), compresslevel=6))
+                n_tiles += len(tiles)
+                print(f"Zoom {z}: {len(tiles)} tiles")
+
+        print(f"Saved {n_tiles} tiles to {out_path}")
+        return out_path
+
+    # -----------------------------------
+    # Tile geometry helpers
+    # -----------------------------------
+    def _tile_range(self, z, bounds):
+        import numpy as np
+
+        span = tile_span_m(z)
+        n = 2 ** z
+        x0 = int(np.clip(np.floor((bounds[0] + WEB_MERCATOR_ORIGIN) / span), 0, n - 1))
+        x1 = int(np.clip(np.floor((bounds[2] + WEB_MERCATOR_ORIGIN) / span), 0, n - 1))
+        y0 = int(np.clip(np.floor((WEB_MERCATOR_ORIGIN - bounds[3]) / span), 0, n - 1))
+        y1 = int(np.clip(np.floor((WEB_MERCATOR_ORIGIN - bounds[1]) / span), 0, n - 1))
+        return x0, x1, y0, y1
+
+    def _add_shape_layer(self, tiles, z, layer, geoms, bounds, props=None, prop_name=None):
+        import numpy as np
+        import shapely
+
+        if len(geoms) == 0:
+            return
+
+        span = tile_span_m(z)
+        unit = span / self.extent
+        pad = self.buffer * unit
+        tolerance = self.tolerance_px * span / self.tile_px
+
+        simplified = shapely.simplify(geoms, tolerance, preserve_topology=True)
+
+        x0, x1, y0, y1 = self._tile_range(z, bounds)
+        xs, ys = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+        xs, ys = xs.ravel(), ys.ravel()
+        minx = -WEB_MERCATOR_ORIGIN + xs * span
+        maxy = WEB_MERCATOR_ORIGIN - ys * span
+        boxes = shapely.box(minx - pad, maxy - span - pad, minx + span + pad, maxy + pad)
+
+        tree = shapely.STRtree(simplified)
+        tile_idx, geom_idx = tree.query(boxes, predicate="intersects")
+        if len(tile_idx) == 0:
+            return
+
+        clipped = shapely.intersection(simplified[geom_idx], boxes[tile_idx])
+
+        # Drop empties and collapsed pieces (points from touching lines, slivers)
+        dim = 2 if layer == "parks" else 1
+        keep = ~shapely.is_empty(clipped) & (shapely.get_dimensions(clipped) == dim)
+        tile_idx, geom_idx, clipped = tile_idx[keep], geom_idx[keep], clipped[keep]
+
+        # query() returns pairs grouped by tile
+        starts = np.flatnonzero(np.r_[True, tile_idx[1:] != tile_idx[:-1]])
+        ends = np.r_[starts[1:], len(tile_idx)]
+        for s, e in zip(starts, ends):
+            t = tile_idx[s]
+            ox, oy = minx[t], maxy[t]
+            local = shapely.transform(
+                clipped[s:e],
+                lambda c, ox=ox, oy=oy: np.round(np.column_stack([(c[:, 0] - ox) / unit, (oy - c[:, 1]) / unit]))
+            )
+            # Coordinates are whole tile units: drop the ".0" of every number.
+            # Only the geometry JSON, never the free-text properties
+            geojson = [_TRAILING_ZERO.sub("", g) for g in shapely.to_geojson(local)]
+            if props is not None:
+                values = props[geom_idx[s:e]]
+                features = [
+                    f'{{"g":{g},"p":{json.dumps({prop_name: _json_value(v)})}}}'
+                    for g, v in zip(geojson, values)
+                ]
+            else:
+                features = [f'{{"g":{g}}}' for g in geojson]
+            tiles.setdefault((int(xs[t]), int(ys[t])), {})[layer] = "[" + ",".join(features) + "]"
+
+    def _add_point_layer(self, tiles, z, xy, classes, dist=None):
+        import numpy as np
+
+        if len(xy) == 0:
+            return
+
+        span = tile_span_m(z)
+        px_units = self.extent // self.tile_px
+
+        gx = (xy[:, 0] + WEB_MERCATOR_ORIGIN) / span
+        gy = (WEB_MERCATOR_ORIGIN - xy[:, 1]) / span
+        tx = np.floor(gx).astype(np.int64)
+        ty = np.floor(gy).astype(np.int64)
+        lx = np.round((gx - tx) * self.extent).astype(np.int64)
+        ly = np.round((gy - ty) * self.extent).astype(np.int64)
+
+        keep = np.arange(len(xy))
+        if dist is None:
+            # Thin to one point per pixel and class
+            key = np.column_stack([tx, ty, lx // px_units, ly // px_units, classes])
+            _, keep = np.unique(key, axis=0, return_index=True)
+            keep.sort()
+
+        order = keep[np.lexsort((ty[keep], tx[keep]))]
+        tile_key = np.column_stack([tx[order], ty[order]])
+        starts = np.flatnonzero(np.r_[True, np.any(tile_key[1:] != tile_key[:-1], axis=1)])
+        ends = np.r_[starts[1:], len(order)]
+        for s, e in zip(starts, ends):
+            sel = order[s:e]
+            layer = {
+                "x": lx[sel].tolist(),
+                "y": ly[sel].tolist(),
+                "c": classes[sel].tolist(),
+            }
+            if dist is not None:
+                d = dist[sel]
+                layer["d"] = [None if np.isnan(v) else int(round(v)) for v in d]
+            tiles.setdefault((int(tile_key[s, 0]), int(tile_key[s, 1])), {})["buildings"] = json.dumps(
+                layer, separators=(",", ":")
+            )
+
+
+def _first_value(series):
+    """
+    OSM tags can be lists after graph simplification; keep the first value.
+    """
+    import numpy as np
+
+    return np.array(
+        [v[0] if isinstance(v, (list, tuple)) and v else v for v in series],
+        dtype=object
+    )
+
+
+def _json_value(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and v != v:
+        return None
+    return str(v)
@@ -1,16 +1,225 @@
+# Walking-distance classes shared by the map layer and the legend:
+# 0: <= 500 m, 1: <= 1000 m, 2: <= 1500 m, 3: not accessible
+DISTANCE_CLASS_BREAKS = (500, 1000, 1500)
+DISTANCE_CLASS_COLORS = ("green", "yellow", "orange", "red")
+
+# Coordinates are sent to the browser as integers in units of 1e-5 degrees (~1 m)
+COORD_SCALE = 100_000
+
+_COMPACT_POINT_TEMPLATE = """
+{% macro script(this, kwargs) %}
+(function() {
+    var data = {{ this.data|tojson }};
+    var group = {{ this._parent.get_name() }};
+    var renderer = L.canvas({padding: 0.5});
+    var lat = data.lat0;
+    for (var i = 0; i < data.dlat.length; i++) {
+        lat += data.dlat[i];
+        var marker = L.circleMarker(
+            [lat / data.scale, (data.lon0 + data.lon[i]) / data.scale],
+            {
+                renderer: renderer,
+                radius: {{ this.radius }},
+                color: data.colors[data.cls[i]],
+                fill: true,
+                fillOpacity: {{ this.fill_opacity }},
+                weight: 1
+            }
+        );
+        marker.cls = data.cls[i];
+        marker.value = data.values ? data.values[i] : null;
+        group.addLayer(marker);
+    }
+    if (data.popup) {
+        group.bindPopup(function(layer) {
+            return data.popup
+                .replace("{value}", layer.value === null ? "n/a" : layer.value)
+                .replace("{label}", data.labels[layer.cls]);
+        });
+    }
+})();
+{% endmacro %}
+"""
+
+_VECTOR_TILE_TEMPLATE = """
+{% macro script(this, kwargs) %}
+var {{ this.get_name() }} = (function() {
+    var url = {{ this.url|tojson }};
+    var colors = {{ this.colors|tojson }};
+    var extent = {{ this.extent }};
+
+    function tracePath(ctx, rings, s) {
+        rings.forEach(function(ring) {
+            ring.forEach(function(pt, i) {
+                if (i === 0) { ctx.moveTo(pt[0] * s, pt[1] * s); }
+                else { ctx.lineTo(pt[0] * s, pt[1] * s); }
+            });
+        });
+    }
+
+    function drawShapes(ctx, features, s) {
+        (features || []).forEach(function(f) {
+            var g = f.g;
+            if (g.type === "Polygon") { tracePath(ctx, g.coordinates, s); }
+            else if (g.type === "MultiPolygon") { g.coordinates.forEach(function(p) { tracePath(ctx, p, s); }); }
+            else if (g.type === "LineString") { tracePath(ctx, [g.coordinates], s); }
+            else if (g.type === "MultiLineString") { tracePath(ctx, g.coordinates, s); }
+        });
+    }
+
+    function drawTile(ctx, data, s) {
+        ctx.beginPath();
+        drawShapes(ctx, data.parks, s);
+        ctx.fillStyle = "rgba(0, 128, 0, 0.6)";
+        ctx.fill("evenodd");
+
+        ctx.beginPath();
+        drawShapes(ctx, data.streets, s);
+        ctx.strokeStyle = "gray";
+        ctx.lineWidth = 1;
+        ctx.stroke();
+
+        var b = data.buildings;
+        if (!b) { return; }
+        for (var i = 0; i < b.x.length; i++) {
+            ctx.beginPath();
+            ctx.arc(b.x[i] * s, b.y[i] * s, {{ this.radius }}, 0, 2 * Math.PI);
+            ctx.fillStyle = colors[b.c[i]];
+            ctx.globalAlpha = 0.6;
+            ctx.fill();
+            ctx.globalAlpha = 1.0;
+        }
+    }
+
+    var VectorTiles = L.GridLayer.extend({
+        createTile: function(coords, done) {
+            var tile = L.DomUtil.create("canvas", "leaflet-tile");
+            var size = this.getTileSize();
+            tile.width = size.x;
+            tile.height = size.y;
+            var tileUrl = url.replace("{z}", coords.z).replace("{x}", coords.x).replace("{y}", coords.y);
+            fetch(tileUrl)
+                .then(function(r) { return r.ok ? r.json() : {}; })
+                .then(function(data) {
+                    drawTile(tile.getContext("2d"), data, size.x / extent);
+                    done(null, tile);
+                })
+                .catch(function(err) { done(err, tile); });
+            return tile;
+        }
+    });
+
+    return new VectorTiles({
+        minNativeZoom: {{ this.min_zoom }},
+        maxNativeZoom: {{ this.max_zoom }},
+        attribution: "OpenStreetMap contributors"
+    }).addTo({{ this._parent.get_name() }});
+})();
+{% endmacro %}
+"""
+
+
+def distance_classes(dist, accessible):
+    """
+    Vectorized distance binning.
+    Returns an int8 array of class codes indexing DISTANCE_CLASS_COLORS.
+    """
+    import numpy as np
+
+    dist = np.asarray(dist, dtype=float)
+    accessible = np.asarray(accessible, dtype=bool)
+
+    classes = np.digitize(dist, DISTANCE_CLASS_BREAKS, right=True).astype(np.int8)
+    classes[~accessible | np.isnan(dist)] = len(DISTANCE_CLASS_BREAKS)
+    return classes
+
+
+def compact_point_data(lat, lon, classes, colors, values=None, labels=None, popup=None):
+    """
+    Pack points into a small JSON-ready dict.
+
+    Coordinates are quantized to COORD_SCALE integers; points are sorted by
+    latitude and latitudes are delta-encoded so most entries are a few digits.
+    values are rounded to integers; NaN/inf become None (null, shown as n/a).
+    """
+    import numpy as np
+
+    lat_q = np.round(np.asarray(lat, dtype=float) * COORD_SCALE).astype(np.int64)
+    lon_q = np.round(np.asarray(lon, dtype=float) * COORD_SCALE).astype(np.int64)
+    classes = np.asarray(classes, dtype=np.int64)
+
+    order = np.argsort(lat_q, kind="stable")
+    lat_q = lat_q[order]
+    lon_q = lon_q[order]
+
+    lat0 = int(lat_q[0]) if len(lat_q) else 0
+    lon0 = int(lon_q.min()) if len(lon_q) else 0
+    dlat = np.diff(lat_q, prepend=lat0)
+
+    data = {
+        "scale": COORD_SCALE,
+        "lat0": lat0,
+        "lon0": lon0,
+        "dlat": dlat.tolist(),
+        "lon": (lon_q - lon0).tolist(),
+        "cls": classes[order].tolist(),
+        "colors": list(colors),
+    }
+    if values is not None:
+        values = np.asarray(values, dtype=float)[order]
+        finite = np.isfinite(values)
+        rounded = np.round(np.where(finite, values, 0)).astype(np.int64).tolist()
+        data["values"] = [v if ok else None for v, ok in zip(rounded, finite.tolist())]
+    if popup is not None:
+        data["popup"] = popup
+        data["labels"] = list(labels) if labels is not None else [""] * len(colors)
+    return data
+
+
+def compact_point_layer(data, name, radius=1, fill_opacity=0.4):
+    """
+    Folium FeatureGroup that draws packed points (see compact_point_data)
+    client-side on a single canvas instead of one SVG marker per point.
+    """
+    import folium
+    from branca.element import MacroElement, Template
+
+    group = folium.FeatureGroup(name=name)
+
+    points = MacroElement()
+    points._name = "CompactPointLayer"
+    points._template = Template(_COMPACT_POINT_TEMPLATE)
+    points.data = data
+    points.radius = radius
+    points.fill_opacity = fill_opacity
+    group.add_child(points)
+
+    return group
+
+
 class FoliumVisualization:
     @staticmethod
-    def plot_map(buildings_gdf, street_gdf, park_gdf, ams_boundary):
+    def plot_map(
+        buildings_gdf,
+        street_gdf,
+        park_gdf,
+        ams_boundary,
+        layer_preprocessor=None,
+        out_path="outputs/NA_outputs/amsterdam_park_accessibility.html"
+    ):
         import folium
         import geopandas as gpd
         import os
+        from .NA_map_layers import MapLayerPreprocessor
+
+        if layer_preprocessor is None:
+            layer_preprocessor = MapLayerPreprocessor()
 
         # -----------------------------
         # Ensure CRS is EPSG:4326
         # -----------------------------
+        # (street and park layers are reprojected by the layer preprocessor)
         buildings_gdf = buildings_gdf.to_crs(epsg=4326)
-        street_gdf = street_gdf.to_crs(epsg=4326)
-        park_gdf = park_gdf.to_crs(epsg=4326)
         ams_boundary = ams_boundary.to_crs(epsg=4326)
 
         buildings_gdf["dist_to_park_m"] = buildings_gdf["dist_to_park_m"].fillna(2000)
@@ -29,7 +238,7 @@ class FoliumVisualization:
         # Boundary
         # -----------------------------
         folium.GeoJson(
-            ams_boundary,
+            layer_preprocessor.prepare(ams_boundary, "boundary"),
             name="Amsterdam Boundary",
             style_function=lambda x: {
                 "fillColor": "none",
@@ -42,7 +251,7 @@ class FoliumVisualization:
         # Street network
         # -----------------------------
         folium.GeoJson(
-            street_gdf,
+            layer_preprocessor.prepare(street_gdf, "streets"),
             name="Walking Network",
             style_function=lambda x: {
                 "color": "gray",
@@ -54,7 +263,7 @@ class FoliumVisualization:
         # Parks
         # -----------------------------
         folium.GeoJson(
-            park_gdf,
+            layer_preprocessor.prepare(park_gdf, "parks"),
             name="Parks",
             style_function=lambda x: {
                 "fillColor": "green",
@@ -67,29 +276,25 @@ class FoliumVisualization:
         # -----------------------------
         # Buildings
         # -----------------------------
-        for _, row in buildings_gdf.iterrows():
-            dist = row["dist_to_park_m"]
-            accessible = row["park_access_1500m"]
-
-            if not accessible:
-                color = "red"
-            elif dist <= 500:
-                color = "green"
-            elif dist <= 1000:
-                color = "yellow"
-            elif dist <= 1500:
-                color = "orange"
-            else:
-                color = "red"
-
-            folium.CircleMarker(
-                location=[row.geometry.y, row.geometry.x],
-                radius=1,
-                color=color,
-                fill=True,
-                fill_opacity=0.4,
-                popup=f"Distance: {dist:.0f} m<br>Accessible: {'Yes' if accessible else 'No'}"
-            ).add_to(m)
+        classes = distance_classes(
+            buildings_gdf["dist_to_park_m"],
+            buildings_gdf["park_access_1500m"]
+        )
+        building_data = compact_point_data(
+            lat=buildings_gdf.geometry.y.to_numpy(),
+            lon=buildings_gdf.geometry.x.to_numpy(),
+            classes=classes,
+            colors=DISTANCE_CLASS_COLORS,
+            values=buildings_gdf["dist_to_park_m"].to_numpy(),
+            labels=["Yes", "Yes", "Yes", "No"],
+            popup="Distance: {value} m<br>Accessible: {label}"
+        )
+        compact_point_layer(
+            building_data,
+            name="Buildings",
+            radius=1,
+            fill_opacity=0.4
+        ).add_to(m)
 
         # -----------------------------
         # Layer control
@@ -128,10 +333,60 @@ class FoliumVisualization:
 
 
         m.get_root().html.add_child(folium.Element(legend_html))
-        m.save("outputs/NA_outputs/amsterdam_park_accessibility.html")
+        m.save(out_path)
         m
         return m
 
+    @staticmethod
+    def plot_tiled_map(
+        ams_boundary,
+        tile_url="http://127.0.0.1:8000/tiles/{z}/{x}/{y}",
+        min_zoom=11,
+        max_zoom=16,
+        extent=4096,
+        out_path="outputs/NA_outputs/amsterdam_park_accessibility_tiles.html"
+    ):
+        """
+        Lightweight map that streams buildings, streets and parks from the
+        tile endpoint of the API (see NA_tiles.TilePyramidExporter), so only
+        the tiles in view are loaded.
+        """
+        import folium
+        from branca.element import MacroElement, Template
+
+        ams_boundary = ams_boundary.to_crs(epsg=4326)
+        minx, miny, maxx, maxy = ams_boundary.total_bounds
+
+        m = folium.Map(
+            location=[(miny + maxy) / 2, (minx + maxx) / 2],
+            zoom_start=min_zoom + 2,
+            min_zoom=min_zoom
+        )
+
+        tiles = MacroElement()
+        tiles._name = "VectorTiles"
+        tiles._template = Template(_VECTOR_TILE_TEMPLATE)
+        tiles.url = tile_url
+        tiles.colors = list(DISTANCE_CLASS_COLORS)
+        tiles.extent = extent
+        tiles.min_zoom = min_zoom
+        tiles.max_zoom = max_zoom
+        tiles.radius = 1.5
+        m.add_child(tiles)
+
+        folium.GeoJson(
+            ams_boundary,
+            name="Amsterdam Boundary",
+            style_function=lambda x: {
+                "fillColor": "none",
+                "color": "blue",
+                "weight": 2
+            }
+        ).add_to(m)
+
+        m.save(out_path)
+        return m
+
 class MatplotlibVisualization:
     @staticmethod
     def plot_map(building_gdf):
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
-import requests
+
+from .park_store import build_park_store
 
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
@@ -23,6 +24,8 @@ def download_parks_geojson(
     if out_file.exists() and not force:
         return out_file
 
+    import requests
+
     query = f"""
     [out:json][timeout:60];
     area["name"="{city_name}"]["boundary"="administrative"]->.searchArea;
@@ -84,3 +87,152 @@ def download_parks_geojson(
     )
 
     return out_file
+
+
+def download_park_store(
+    city_name: str,
+    geojson_path: str = "data/parks.geojson",
+    store_dir: str = "data/parks_store",
+    force: bool = False,
+    timeout_s: int = 60,
+):
+    """
+    Download parks for a city (see download_parks_geojson) and convert them
+    into a compact park store (see park_store.py). The store is rebuilt
+    whenever the GeoJSON is newer than it.
+    """
+
+    geojson_file = download_parks_geojson(
+        city_name,
+        out_path=geojson_path,
+        force=force,
+        timeout_s=timeout_s,
+    )
+
+    store = Path(store_dir)
+    marker = store / "parks.npy"
+    if force or not marker.exists() or marker.stat().st_mtime < geojson_file.stat().st_mtime:
+        build_park_store(str(geojson_file), str(store))
+
+    return store
+
+
+def download_boundary_geojson(
+    city_name: str,
+    out_path: str = "data/boundary.geojson",
+    admin_level: str = "8",
+    force: bool = False,
+    timeout_s: int = 60,
+):
+    """
+    Download the administrative boundary of a city from OpenStreetMap
+    and save it as a GeoJSON MultiPolygon.
+    admin_level 8 is the municipality level in the Netherlands.
+    """
+
+    out_file = Path(out_path)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+
+    if out_file.exists() and not force:
+        return out_file
+
+    import requests
+
+    query = f"""
+    [out:json][timeout:60];
+    relation["name"="{city_name}"]["boundary"="administrative"]["admin_level"="{admin_level}"];
+    out geom;
+    """
+
+    try:
+        response = requests.post(
+            OVERPASS_URL,
+            data={"data": query},
+            timeout=timeout_s
+        )
+        response.raise_for_status()
+        data = response.json()
+    except requests.RequestException as e:
+        if out_file.exists():
+            return out_file
+        raise RuntimeError("Failed to download data from Overpass API") from e
+
+    outer, inner = [], []
+    for element in data.get("elements", []):
+        for member in element.get("members", []):
+            geometry = member.get("geometry")
+            if member.get("type") != "way" or not geometry:
+                continue
+            way = [(p["lon"], p["lat"]) for p in geometry]
+            (inner if member.get("role") == "inner" else outer).append(way)
+
+    outer_rings = _stitch_rings(outer)
+    if not outer_rings:
+        raise RuntimeError(f"No boundary found for {city_name}")
+
+    # Attach each hole to the outer ring that contains it
+    polygons = [[ring] for ring in outer_rings]
+    for ring in _stitch_rings(inner):
+        for polygon in polygons:
+            if _point_in_ring(ring[0], polygon[0]):
+                polygon.append(ring)
+                break
+
+    geojson = {
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "properties": {"name": city_name, "admin_level": admin_level},
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        }],
+    }
+
+    out_file.write_text(
+        json.dumps(geojson, indent=2),
+        encoding="utf-8"
+    )
+
+    return out_file
+
+
+def _stitch_rings(ways):
+    """
+    Join way segments end-to-end into closed rings (relation members are
+    not guaranteed to be ordered or oriented consistently).
+    """
+    remaining = [list(w) for w in ways if len(w) > 1]
+    rings = []
+
+    while remaining:
+        ring = remaining.pop(0)
+        while ring[0] != ring[-1]:
+            for i, way in enumerate(remaining):
+                if way[0] == ring[-1]:
+                    ring.extend(way[1:])
+                elif way[-1] == ring[-1]:
+                    ring.extend(reversed(way[:-1]))
+                elif way[-1] == ring[0]:
+                    ring[:0] = way[:-1]
+                elif way[0] == ring[0]:
+                    ring[:0] = list(reversed(way[1:]))
+                else:
+                    continue
+                remaining.pop(i)
+                break
+            else:
+                # Unclosable fragment (e.g. clipped by the query); close it directly
+                ring.append(ring[0])
+
+        if len(ring) >= 4:
+            rings.append(ring)
+
+    return rings
+
+
+def _point_in_ring(point, ring):
+    x, y = point
+    inside = False
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
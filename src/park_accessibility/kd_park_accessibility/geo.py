@@ -1,4 +1,9 @@
 import math
+from typing import List, Tuple
+
+import numpy as np
+
+R_EARTH_M = 6371000.0  # Earth radius in meters
 
 
 def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -6,7 +11,7 @@ def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     Great-circle distance between two points on Earth (meters).
     Inputs are in degrees.
     """
-    R = 6371000.0  # Earth radius in meters
+    R = R_EARTH_M
 
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -17,3 +22,90 @@ def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return R * c
+
+
+def haversine_m_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Vectorized haversine_m over numpy arrays (broadcasting), in meters.
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lon2) - np.asarray(lon1))
+
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * R_EARTH_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def to_local_xy(lats, lons, lat0: float, lon0: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Equirectangular projection around (lat0, lon0): meters east/north.
+    Accurate to well below a meter across a city.
+    """
+    x = np.radians(np.asarray(lons) - lon0) * R_EARTH_M * math.cos(math.radians(lat0))
+    y = np.radians(np.asarray(lats) - lat0) * R_EARTH_M
+    return x, y
+
+
+def from_local_xy(x, y, lat0: float, lon0: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of to_local_xy; returns (lats, lons).
+    """
+    lats = lat0 + np.degrees(np.asarray(y) / R_EARTH_M)
+    lons = lon0 + np.degrees(np.asarray(x) / (R_EARTH_M * math.cos(math.radians(lat0))))
+    return lats, lons
+
+
+def scanline_mask(
+    rings: List[np.ndarray],
+    origin: Tuple[float, float],
+    cell_size: float,
+    shape: Tuple[int, int],
+) -> np.ndarray:
+    """
+    Even-odd fill of closed rings on a regular grid: a cell is set when its
+    center lies inside. Rings are (n, 2) coordinate arrays in the grid's
+    units; origin is (minx, maxy) and row 0 is the northern edge.
+    Works row by row, so memory stays at one boolean grid plus the edges.
+    """
+    rows, cols = shape
+    minx, maxy = origin
+    mask = np.zeros(shape, dtype=bool)
+
+    rings = [np.asarray(r, dtype=float) for r in rings if len(r) > 1]
+    if not rings:
+        return mask
+
+    x0 = np.concatenate([r[:-1, 0] for r in rings])
+    y0 = np.concatenate([r[:-1, 1] for r in rings])
+    x1 = np.concatenate([r[1:, 0] for r in rings])
+    y1 = np.concatenate([r[1:, 1] for r in rings])
+
+    # Only non-horizontal edges can cross a scanline; sort them by min y
+    keep = y0 != y1
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+    ylo, yhi = np.minimum(y0, y1), np.maximum(y0, y1)
+    order = np.argsort(ylo)
+    x0, y0, x1, y1, ylo, yhi = x0[order], y0[order], x1[order], y1[order], ylo[order], yhi[order]
+
+    row_y = maxy - (np.arange(rows) + 0.5) * cell_size
+    n_active = np.searchsorted(ylo, row_y, side="right")
+
+    for r in range(rows):
+        y = row_y[r]
+        cand = slice(0, n_active[r])
+        hit = yhi[cand] > y
+        if not hit.any():
+            continue
+        ex0, ey0, ex1, ey1 = x0[cand][hit], y0[cand][hit], x1[cand][hit], y1[cand][hit]
+        xs = np.sort(ex0 + (y - ey0) * (ex1 - ex0) / (ey1 - ey0))
+
+        # Cell c is inside a span [a, b) when its center minx + (c + 0.5) * cell_size is
+        c0 = np.clip(np.ceil((xs[0::2] - minx) / cell_size - 0.5), 0, cols).astype(np.int64)
+        c1 = np.clip(np.ceil((xs[1::2] - minx) / cell_size - 0.5), 0, cols).astype(np.int64)
+        edges = np.zeros(cols + 1, dtype=np.int32)
+        np.add.at(edges, c0, 1)
+        np.add.at(edges, c1, -1)
+        mask[r] = np.cumsum(edges[:-1]) > 0
+
+    return mask
@@ -1,6 +1,11 @@
-from typing import List, Dict, Tuple
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Dict, Tuple
 import numpy as np
-from scipy.spatial import KDTree
+
+if TYPE_CHECKING:
+    from scipy.spatial import KDTree
+    from .park_store import ParkStore
 
 
 def build_park_kdtree(
@@ -13,6 +18,8 @@ def build_park_kdtree(
     returns: (KDTree, metadata list)
     """
 
+    from scipy.spatial import KDTree
+
     points = []
     metadata = []
 
@@ -26,6 +33,17 @@ def build_park_kdtree(
     return tree, metadata
 
 
+def build_park_store_kdtree(store: ParkStore) -> KDTree:
+    """
+    Build a KD-Tree straight from the park store's lat/lon columns.
+    Tree index i is park i of the store; look names up with store.name(i).
+    """
+
+    from scipy.spatial import KDTree
+
+    return KDTree(np.column_stack([store.parks["lat"], store.parks["lon"]]))
+
+
 def nearest_park(
     tree: KDTree,
     metadata: List[Dict[str, float]],
@@ -39,3 +57,19 @@ def nearest_park(
 
     distance, index = tree.query([lat, lon])
     return metadata[index]
+
+
+def nearest_parks(
+    tree: KDTree,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    workers: int = -1,
+) -> np.ndarray:
+    """
+    Batch version of nearest_park: one vectorized KD-Tree query for many
+    points. Returns the index into the metadata list for each point.
+    """
+
+    points = np.column_stack([np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)])
+    _, index = tree.query(points, workers=workers)
+    return index
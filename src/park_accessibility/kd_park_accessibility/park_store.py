@@ -0,0 +1,203 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from .geo import R_EARTH_M
+
+# One row per park; ring_* index into coords.npy, name_* into names.npy
+PARK_DTYPE = np.dtype([
+    ("osm_id", "<i8"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("area_m2", "<f8"),
+    ("min_lon", "<f8"),
+    ("min_lat", "<f8"),
+    ("max_lon", "<f8"),
+    ("max_lat", "<f8"),
+    ("ring_start", "<i8"),
+    ("ring_end", "<i8"),
+    ("name_start", "<i8"),
+    ("name_end", "<i8"),
+])
+
+UNNAMED = "Unnamed park"
+
+
+class ParkStore:
+    """
+    Compact, column-oriented park data.
+
+    parks:  structured array (PARK_DTYPE)
+    coords: (n_vertices, 2) lon/lat of all outer rings, packed back to back
+    names:  utf-8 bytes of all names, packed back to back
+    """
+
+    def __init__(self, parks: np.ndarray, coords: np.ndarray, names: np.ndarray):
+        self.parks = parks
+        self.coords = coords
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.parks)
+
+    def name(self, i: int) -> str:
+        row = self.parks[i]
+        return bytes(self.names[row["name_start"]:row["name_end"]]).decode("utf-8") or UNNAMED
+
+    def ring(self, i: int) -> np.ndarray:
+        """
+        Outer ring of park i as a (n, 2) lon/lat view into coords.
+        """
+        row = self.parks[i]
+        return self.coords[row["ring_start"]:row["ring_end"]]
+
+    def to_records(self) -> List[Dict[str, float]]:
+        """
+        Parks as dicts with keys name, lat, lon (the build_park_kdtree input).
+        """
+        lats = self.parks["lat"].tolist()
+        lons = self.parks["lon"].tolist()
+        return [
+            {"name": self.name(i), "lat": lat, "lon": lon}
+            for i, (lat, lon) in enumerate(zip(lats, lons))
+        ]
+
+
+def build_park_store(geojson_path: str, out_dir: str) -> Path:
+    """
+    Convert a parks GeoJSON (as written by downloader.py) into a park store.
+    Centroids, areas and bounding boxes are computed for all rings at once.
+    The store is written to a temporary directory and renamed into place,
+    so concurrent rebuilds never expose half-written files.
+    """
+    data = json.loads(Path(geojson_path).read_text(encoding="utf-8"))
+
+    rings, ids, names = [], [], []
+    for feat in data.get("features", []):
+        geom = feat.get("geometry", {}) or {}
+        if geom.get("type") != "Polygon":
+            continue
+        coords = geom.get("coordinates", [])
+        if not coords or not coords[0]:
+            continue
+
+        props = feat.get("properties", {}) or {}
+        rings.append(coords[0])  # outer ring
+        ids.append(props.get("osm_id") or -1)
+        names.append((props.get("name") or "").encode("utf-8"))
+
+    lengths = np.array([len(r) for r in rings], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    coords = np.array([pt[:2] for ring in rings for pt in ring], dtype=np.float64).reshape(-1, 2)
+
+    name_lengths = np.array([len(n) for n in names], dtype=np.int64)
+    name_ends = np.cumsum(name_lengths)
+    name_bytes = np.frombuffer(b"".join(names), dtype=np.uint8)
+
+    parks = np.zeros(len(rings), dtype=PARK_DTYPE)
+    parks["osm_id"] = ids
+    parks["ring_start"] = starts
+    parks["ring_end"] = ends
+    parks["name_start"] = name_ends - name_lengths
+    parks["name_end"] = name_ends
+
+    if len(rings):
+        lat, lon, area_deg2 = _ring_centroids(coords, starts, lengths)
+        parks["lat"] = lat
+        parks["lon"] = lon
+        # Degrees^2 -> m^2 at the ring's latitude
+        deg_m = R_EARTH_M * math.pi / 180.0
+        parks["area_m2"] = np.abs(area_deg2) * deg_m ** 2 * np.cos(np.radians(lat))
+        parks["min_lon"] = np.minimum.reduceat(coords[:, 0], starts)
+        parks["max_lon"] = np.maximum.reduceat(coords[:, 0], starts)
+        parks["min_lat"] = np.minimum.reduceat(coords[:, 1], starts)
+        parks["max_lat"] = np.maximum.reduceat(coords[:, 1], starts)
+
+    out = Path(out_dir)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=out.parent, prefix=f".{out.name}.partial-"))
+    try:
+        np.save(tmp / "parks.npy", parks)
+        np.save(tmp / "coords.npy", coords)
+        np.save(tmp / "names.npy", name_bytes)
+        _replace_dir(tmp, out)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return out
+
+
+def load_park_store(store_dir: str) -> ParkStore:
+    """
+    Memory-map a park store; nothing is parsed or copied up front.
+    """
+    d = Path(store_dir)
+    return ParkStore(
+        parks=np.load(d / "parks.npy", mmap_mode="r"),
+        coords=np.load(d / "coords.npy", mmap_mode="r"),
+        names=np.load(d / "names.npy", mmap_mode="r"),
+    )
+
+
+def _replace_dir(src: Path, dst: Path) -> None:
+    """
+    Rename directory src to dst. An existing dst is first renamed aside and
+    removed; stores that readers already memory-mapped stay valid.
+    """
+    while True:
+        try:
+            os.replace(src, dst)
+            return
+        except OSError:
+            if not dst.exists():
+                raise
+        # dst is a non-empty directory: move it onto a fresh empty one
+        old = Path(tempfile.mkdtemp(dir=dst.parent, prefix=f".{dst.name}.old-"))
+        try:
+            os.replace(dst, old)
+        except FileNotFoundError:
+            pass  # another writer moved it first
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _ring_centroids(coords: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+    """
+    Shoelace area and area-weighted centroid of every packed (closed) ring.
+    Rings with fewer than 3 vertices or ~zero area fall back to the vertex
+    average. Returns (lat, lon, signed area in degrees^2).
+    """
+    n = len(starts)
+    ring_id = np.repeat(np.arange(n), lengths)
+
+    # Work relative to each ring's first vertex for numerical stability
+    origin = coords[starts]
+    local = coords - origin[ring_id]
+    x, y = local[:, 0], local[:, 1]
+
+    # Cross products of consecutive vertices, zeroed across ring boundaries
+    cross = np.zeros(len(coords))
+    same = ring_id[1:] == ring_id[:-1]
+    cross[:-1] = np.where(same, x[:-1] * y[1:] - x[1:] * y[:-1], 0.0)
+    sx = np.zeros(len(coords))
+    sy = np.zeros(len(coords))
+    sx[:-1] = np.where(same, (x[:-1] + x[1:]) * cross[:-1], 0.0)
+    sy[:-1] = np.where(same, (y[:-1] + y[1:]) * cross[:-1], 0.0)
+
+    a = np.add.reduceat(cross, starts) * 0.5
+    cx = np.add.reduceat(sx, starts)
+    cy = np.add.reduceat(sy, starts)
+
+    mean_x = np.add.reduceat(x, starts) / lengths
+    mean_y = np.add.reduceat(y, starts) / lengths
+
+    degenerate = (lengths < 3) | (np.abs(2.0 * a) < 1e-12)
+    safe_a = np.where(degenerate, 1.0, a)
+    lon = np.where(degenerate, mean_x, cx / (6.0 * safe_a)) + origin[:, 0]
+    lat = np.where(degenerate, mean_y, cy / (6.0 * safe_a)) + origin[:, 1]
+    return lat, lon, np.where(lengths < 3, 0.0, a)
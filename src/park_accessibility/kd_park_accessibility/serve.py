@@ -0,0 +1,125 @@
+"""
+Pre-fork server for the park accessibility API.
+
+`uvicorn --workers N` starts N fresh interpreters, and each one imports
+the app and builds its own KD-tree on its first request. Here the parent
+process imports the app once, builds the park index and maps the tile
+archive, freezes the heap (gc.freeze) and only then forks the workers.
+The workers share the listening socket and the warm index, copy-on-write.
+
+    python -m park_accessibility.kd_park_accessibility.serve --workers 4 --city Amsterdam --port 8000
+
+POSIX only (os.fork).
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import traceback
+from typing import List, Optional
+
+
+def preload(city: str = "Amsterdam") -> None:
+    """
+    Warm the service caches: park store + KD-tree and the tile archive.
+    """
+    from . import service
+
+    service._get_index(city)
+    service._get_tile_archive()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+    from . import service
+
+    config = uvicorn.Config(service.app, log_level=log_level, lifespan="off")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 2,
+    city: str = "Amsterdam",
+    log_level: str = "warning",
+) -> int:
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork serving needs os.fork; use uvicorn --workers instead")
+
+    preload(city)
+    sock = bind_socket(host, port)
+
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers don't touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+    children: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(sock, log_level)
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+            except BaseException:
+                # Report the failure to the parent instead of exiting cleanly
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stderr.flush()
+                os._exit(code)
+        children.append(pid)
+
+    def _stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    print(f"Serving on http://{host}:{port} with {workers} pre-forked workers (parent pid {os.getpid()})")
+
+    status = 0
+    for pid in children:
+        while True:
+            try:
+                _, code = os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+        status = status or os.waitstatus_to_exitcode(code)
+    sock.close()
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing a warm index.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--city", default="Amsterdam", help="City whose park index is built before forking")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers, args.city, args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,64 +1,37 @@
 from functools import lru_cache
 from typing import Optional, Tuple, Dict, Any
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.middleware.cors import CORSMiddleware
 
-from park_access.downloader import download_parks_geojson
-from park_access.kdtree import build_park_kdtree, nearest_park
-from park_access.geo import haversine_m
+# Index building (requests, scipy) is imported on first use, so workers
+# start fast; serve.py warms the caches in the parent before forking.
+from .geo import haversine_m
+from .tiles import TileArchive
 
-import json
+import os
 from pathlib import Path
 
-app = FastAPI(title="Park Accessibility API")
-
-
-def _load_parks_from_geojson(path: str) -> list[dict]:
-    """
-    Load parks from a GeoJSON FeatureCollection created by downloader.py.
-    Returns a list of dicts with: name, lat, lon.
-    """
-    p = Path(path)
-    data = json.loads(p.read_text(encoding="utf-8"))
-    parks = []
-
-    for feat in data.get("features", []):
-        props = feat.get("properties", {}) or {}
-        name = props.get("name") or "Unnamed park"
-
-        geom = feat.get("geometry", {}) or {}
-        if geom.get("type") != "Polygon":
-            continue
-
-        coords = geom.get("coordinates", [])
-        if not coords or not coords[0]:
-            continue
-
-        # coords[0] is the outer ring: [(lon, lat), (lon, lat), ...]
-        ring = coords[0]
-        lons = [pt[0] for pt in ring]
-        lats = [pt[1] for pt in ring]
-        if not lons or not lats:
-            continue
-
-        # simple centroid (average) good enough for assignment
-        lon_c = sum(lons) / len(lons)
-        lat_c = sum(lats) / len(lats)
+TILES_PATH = os.environ.get("PARK_TILES_PATH", "outputs/NA_outputs/park_tiles.pkt")
 
-        parks.append({"name": name, "lat": lat_c, "lon": lon_c})
+app = FastAPI(title="Park Accessibility API")
 
-    return parks
+# Tile maps are usually opened from a local HTML file, so allow cross-origin GETs
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["GET"])
 
 
 @lru_cache(maxsize=1)
-def _get_index(city: str = "Amsterdam") -> Tuple[Any, list[dict]]:
+def _get_index(city: str = "Amsterdam") -> Tuple[Any, Any]:
     """
-    Build (and cache) the KD-Tree and metadata once.
+    Build (and cache) the KD-Tree over the memory-mapped park store once.
+    Returns (tree, store); tree index i is park i of the store.
     """
-    geojson_path = download_parks_geojson(city_name=city)
-    parks = _load_parks_from_geojson(str(geojson_path))
-    tree, meta = build_park_kdtree(parks)
-    return tree, meta
+    from .downloader import download_park_store
+    from .kdtree import build_park_store_kdtree
+    from .park_store import load_park_store
+
+    store = load_park_store(str(download_park_store(city_name=city)))
+    return build_park_store_kdtree(store), store
 
 
 @app.get("/check_accessibility")
@@ -68,16 +41,56 @@ def check_accessibility(
     city: str = Query("Amsterdam", description="City name used to load parks"),
     threshold_m: float = Query(500.0, description="Accessibility threshold in meters"),
 ) -> Dict[str, Any]:
-    tree, meta = _get_index(city)
-
-    park = nearest_park(tree, meta, lat, lon)
-    if not park:
+    tree, store = _get_index(city)
+    if not len(store):
         return {"error": "No parks found for this city."}
 
-    dist = haversine_m(lat, lon, park["lat"], park["lon"])
+    _, i = tree.query([lat, lon])
+    park_lat = float(store.parks["lat"][i])
+    park_lon = float(store.parks["lon"][i])
+
+    dist = haversine_m(lat, lon, park_lat, park_lon)
     return {
-        "nearest_park": park.get("name"),
+        "nearest_park": store.name(i),
         "distance_m": round(dist, 2),
         "accessible": dist < threshold_m,
         "threshold_m": threshold_m,
     }
+
+
+@lru_cache(maxsize=1)
+def _get_tile_archive(path: str = TILES_PATH) -> Optional[TileArchive]:
+    """
+    Memory-map the tile archive once; tiles are served as slices of the map.
+    """
+    if not Path(path).exists():
+        return None
+    return TileArchive(path)
+
+
+@app.get("/tiles/metadata.json")
+def tile_metadata() -> Dict[str, Any]:
+    archive = _get_tile_archive()
+    if archive is None:
+        raise HTTPException(status_code=404, detail="No tile archive available.")
+    return archive.metadata
+
+
+@app.get("/tiles/{z}/{x}/{y}")
+def get_tile(z: int, x: int, y: int) -> Response:
+    archive = _get_tile_archive()
+    if archive is None:
+        raise HTTPException(status_code=404, detail="No tile archive available.")
+
+    tile = archive.get(z, x, y)
+    if tile is None:
+        raise HTTPException(status_code=404, detail="Tile not found.")
+
+    return Response(
+        content=bytes(tile),
+        media_type="application/json",
+        headers={
+            "Content-Encoding": "gzip",
+            "Cache-Control": "public, max-age=86400",
+        },
+    )
@@ -0,0 +1,132 @@
+import json
+import math
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Single-file tile archive:
+#   header | tile blobs ... | metadata (JSON) | index
+# The index is a sorted array of (z, x, y, offset, length) entries so a
+# reader only needs the header, the index and an mmap of the file.
+MAGIC = b"PKTL"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIQQI")  # magic, version, reserved, n_tiles, index_offset, meta_offset, meta_length
+_ENTRY = struct.Struct("<BIIQI")  # z, x, y, offset, length
+
+WEB_MERCATOR_ORIGIN = 20037508.342789244  # half the EPSG:3857 world width (meters)
+
+
+def tile_span_m(z: int) -> float:
+    """
+    Width/height of one tile at zoom z in EPSG:3857 meters.
+    """
+    return 2 * WEB_MERCATOR_ORIGIN / (2 ** z)
+
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    """
+    XYZ (slippy map) tile containing a lon/lat point.
+    """
+    n = 2 ** z
+    lat_rad = math.radians(lat)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds_m(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    (minx, miny, maxx, maxy) of an XYZ tile in EPSG:3857 meters.
+    """
+    span = tile_span_m(z)
+    minx = -WEB_MERCATOR_ORIGIN + x * span
+    maxy = WEB_MERCATOR_ORIGIN - y * span
+    return minx, maxy - span, minx + span, maxy
+
+
+class TileArchiveWriter:
+    """
+    Stream tiles into a single archive file.
+
+    with TileArchiveWriter("tiles.pkt", metadata={...}) as w:
+        w.add(z, x, y, blob)
+    """
+
+    def __init__(self, path: str, metadata: Optional[dict] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.metadata = dict(metadata or {})
+        self._entries = []
+        self._fh = open(self.path, "wb")
+        self._fh.write(b"\0" * _HEADER.size)
+
+    def add(self, z: int, x: int, y: int, data: bytes):
+        offset = self._fh.tell()
+        self._fh.write(data)
+        self._entries.append((z, x, y, offset, len(data)))
+
+    def close(self):
+        if self._fh.closed:
+            return
+
+        meta = json.dumps(self.metadata, separators=(",", ":")).encode("utf-8")
+        meta_offset = self._fh.tell()
+        self._fh.write(meta)
+
+        index_offset = self._fh.tell()
+        for entry in sorted(self._entries):
+            self._fh.write(_ENTRY.pack(*entry))
+
+        self._fh.seek(0)
+        self._fh.write(
+            _HEADER.pack(MAGIC, VERSION, 0, len(self._entries), index_offset, meta_offset, len(meta))
+        )
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TileArchive:
+    """
+    Read-only, memory-mapped view of an archive written by TileArchiveWriter.
+    Tile lookups return zero-copy memoryview slices of the mapped file.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n_tiles, index_offset, meta_offset, meta_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tile archive")
+        if version != VERSION:
+            raise ValueError(f"Unsupported tile archive version {version}")
+
+        self.metadata = json.loads(bytes(self._mm[meta_offset:meta_offset + meta_length]).decode("utf-8"))
+        self._index: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+        for z, x, y, offset, length in _ENTRY.iter_unpack(self._mm[index_offset:index_offset + n_tiles * _ENTRY.size]):
+            self._index[(z, x, y)] = (offset, length)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key) -> bool:
+        return tuple(key) in self._index
+
+    def get(self, z: int, x: int, y: int) -> Optional[memoryview]:
+        entry = self._index.get((z, x, y))
+        if entry is None:
+            return None
+        offset, length = entry
+        return memoryview(self._mm)[offset:offset + length]
+
+    def close(self):
+        self._mm.close()
+        self._fh.close()
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import json
-import math
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
-import folium
+import numpy as np
 
-from src.park_access.geo import haversine_m
-from src.park_access.kdtree import build_park_kdtree, nearest_park
+# matplotlib, folium and the downloader are imported by the functions that
+# draw or download, so importing this module stays cheap
+from .geo import from_local_xy, haversine_m_array, scanline_mask, to_local_xy
+from .kdtree import build_park_store_kdtree, nearest_parks
+from .park_store import build_park_store, load_park_store
+
+if TYPE_CHECKING:
+    from .park_store import ParkStore
 
 
 # ---------- Load + centroids ----------
@@ -19,99 +23,94 @@ def load_parks_geojson(path: str = "data/parks.geojson") -> List[dict]:
     return geo["features"]
 
 
-def _centroid_of_polygon(coords: List[Tuple[float, float]]) -> Tuple[float, float]:
+def extract_park_centroids(
+    parks_geojson_path: str = "data/parks.geojson",
+    store_dir: str = "data/parks_store",
+) -> ParkStore:
     """
-    coords: list of (lon, lat) tuples for outer ring (closed)
-    returns (lat, lon)
+    Park centroids from the shared park store (the same data the API uses),
+    rebuilt from the GeoJSON when the store is missing or stale. The store
+    is memory-mapped: lat/lon are the columns store.parks["lat"/"lon"].
     """
-    if len(coords) < 3:
-        xs = [c[0] for c in coords]
-        ys = [c[1] for c in coords]
-        return (sum(ys) / len(ys), sum(xs) / len(xs))
-
-    a = 0.0
-    cx = 0.0
-    cy = 0.0
-    for i in range(len(coords) - 1):
-        x0, y0 = coords[i]
-        x1, y1 = coords[i + 1]
-        cross = x0 * y1 - x1 * y0
-        a += cross
-        cx += (x0 + x1) * cross
-        cy += (y0 + y1) * cross
-
-    if abs(a) < 1e-12:
-        xs = [c[0] for c in coords]
-        ys = [c[1] for c in coords]
-        return (sum(ys) / len(ys), sum(xs) / len(xs))
-
-    a *= 0.5
-    cx /= (6.0 * a)
-    cy /= (6.0 * a)
-    return (cy, cx)  # lat, lon
-
-
-def extract_park_centroids(parks_geojson_path: str = "data/parks.geojson") -> List[dict]:
-    feats = load_parks_geojson(parks_geojson_path)
-    parks = []
-    for f in feats:
-        geom = f.get("geometry", {})
-        if geom.get("type") != "Polygon":
-            continue
-        coords = geom.get("coordinates", [])
-        if not coords or not coords[0]:
-            continue
-
-        ring = coords[0]  # outer ring
-        ring_tuples = [(pt[0], pt[1]) for pt in ring]  # (lon, lat)
-        lat, lon = _centroid_of_polygon(ring_tuples)
-
-        parks.append(
-            {
-                "name": (f.get("properties", {}) or {}).get("name") or "Unnamed park",
-                "lat": float(lat),
-                "lon": float(lon),
-            }
-        )
-    return parks
+    marker = Path(store_dir) / "parks.npy"
+    if not marker.exists() or marker.stat().st_mtime < Path(parks_geojson_path).stat().st_mtime:
+        build_park_store(parks_geojson_path, store_dir)
+    return load_park_store(store_dir)
+
+
+def load_boundary_rings(path: str = "data/boundary.geojson") -> List[np.ndarray]:
+    """
+    All rings (outer and inner) of a boundary GeoJSON as (n, 2) lon/lat arrays.
+    """
+    geo = json.loads(Path(path).read_text(encoding="utf-8"))
+    rings = []
+    for f in geo["features"]:
+        geom = f.get("geometry") or {}
+        polygons = geom.get("coordinates", [])
+        if geom.get("type") == "Polygon":
+            polygons = [polygons]
+        for polygon in polygons:
+            rings.extend(np.asarray(ring, dtype=float) for ring in polygon)
+    return rings
 
 
 # ---------- Grid sampling ----------
 
-def make_grid_points(parks: List[dict], step_deg: float = 0.003) -> List[Tuple[float, float]]:
+def make_grid_points(
+    parks: ParkStore,
+    step_m: float = 100.0,
+    boundary: Optional[List[np.ndarray]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Creates a grid over the bounding box of the parks.
-    step_deg ~ 0.003 is a few hundred meters in NL.
-    Returns list of (lat, lon).
+    Regular grid with step_m spacing in meters (local equirectangular
+    projection), masked to the boundary rings (lon/lat) when given,
+    otherwise covering the padded bounding box of the parks.
+    Returns (lats, lons) arrays.
     """
-    lats = [p["lat"] for p in parks]
-    lons = [p["lon"] for p in parks]
-
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
-
-    # Small padding
-    pad_lat = (max_lat - min_lat) * 0.05
-    pad_lon = (max_lon - min_lon) * 0.05
-    min_lat -= pad_lat
-    max_lat += pad_lat
-    min_lon -= pad_lon
-    max_lon += pad_lon
-
-    pts = []
-    lat = min_lat
-    while lat <= max_lat:
-        lon = min_lon
-        while lon <= max_lon:
-            pts.append((lat, lon))
-            lon += step_deg
-        lat += step_deg
-    return pts
+    if boundary:
+        all_pts = np.concatenate(boundary)
+        min_lon, min_lat = all_pts.min(axis=0)
+        max_lon, max_lat = all_pts.max(axis=0)
+    else:
+        lats = parks.parks["lat"]
+        lons = parks.parks["lon"]
+        min_lat, max_lat = lats.min(), lats.max()
+        min_lon, max_lon = lons.min(), lons.max()
+
+        # Small padding
+        pad_lat = (max_lat - min_lat) * 0.05
+        pad_lon = (max_lon - min_lon) * 0.05
+        min_lat -= pad_lat
+        max_lat += pad_lat
+        min_lon -= pad_lon
+        max_lon += pad_lon
+
+    lat0 = (min_lat + max_lat) / 2
+    lon0 = (min_lon + max_lon) / 2
+    (minx, maxx), (miny, maxy) = to_local_xy([min_lat, max_lat], [min_lon, max_lon], lat0, lon0)
+
+    cols = int(np.floor((maxx - minx) / step_m)) + 1
+    rows = int(np.floor((maxy - miny) / step_m)) + 1
+
+    if boundary:
+        local_rings = [np.column_stack(to_local_xy(r[:, 1], r[:, 0], lat0, lon0)) for r in boundary]
+        # Cell centers of this grid are the sample points
+        origin = (minx - step_m / 2, maxy + step_m / 2)
+        mask = scanline_mask(local_rings, origin, step_m, (rows, cols))
+        row, col = np.nonzero(mask)
+    else:
+        row, col = np.divmod(np.arange(rows * cols), cols)
+
+    x = minx + col * step_m
+    y = maxy - row * step_m
+    return from_local_xy(x, y, lat0, lon0)
 
 
 # ---------- Bar chart ----------
 
 def save_bar_chart(accessible: int, inaccessible: int, out_path: str = "outputs/accessibility_bar.png"):
+    import matplotlib.pyplot as plt
+
     total = accessible + inaccessible
     acc_pct = 100.0 * accessible / total
     inac_pct = 100.0 * inaccessible / total
@@ -130,63 +129,77 @@ def save_bar_chart(accessible: int, inaccessible: int, out_path: str = "outputs/
 # ---------- Folium map ----------
 
 def save_folium_map(
-    parks: List[dict],
-    inaccessible_points: List[Tuple[float, float]],
+    parks: ParkStore,
+    inaccessible_lats: np.ndarray,
+    inaccessible_lons: np.ndarray,
     out_path: str = "outputs/accessibility_map.html",
 ):
+    import folium
+    from ..NA_park_accessibility.NA_visualization import (
+        compact_point_data,
+        compact_point_layer,
+    )
+
     Path(out_path).parent.mkdir(parents=True, exist_ok=True)
 
     # Center map on average park location
-    center_lat = sum(p["lat"] for p in parks) / len(parks)
-    center_lon = sum(p["lon"] for p in parks) / len(parks)
+    center_lat = float(np.mean(parks.parks["lat"]))
+    center_lon = float(np.mean(parks.parks["lon"]))
 
     m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
 
-    # Parks in green
-    for p in parks:
-        folium.CircleMarker(
-            location=[p["lat"], p["lon"]],
-            radius=4,
-            popup=p["name"],
-            fill=True,
-        ).add_to(m)
-
-    # Inaccessible points in red (sample only to keep file size reasonable)
-    # If there are many points, plotting all can make the HTML huge.
-    max_points = 1500
-    pts = inaccessible_points[:max_points]
-    for (lat, lon) in pts:
+    # Inaccessible points in red, all of them: packed and drawn on a canvas
+    compact_point_layer(
+        compact_point_data(
+            inaccessible_lats,
+            inaccessible_lons,
+            classes=np.zeros(len(inaccessible_lats), dtype=np.int8),
+            colors=["red"],
+        ),
+        name="Inaccessible points",
+        radius=2,
+        fill_opacity=0.4,
+    ).add_to(m)
+
+    # Parks
+    for i, (lat, lon) in enumerate(zip(parks.parks["lat"].tolist(), parks.parks["lon"].tolist())):
         folium.CircleMarker(
             location=[lat, lon],
-            radius=2,
+            radius=4,
+            popup=parks.name(i),
             fill=True,
         ).add_to(m)
 
+    folium.LayerControl().add_to(m)
     m.save(out_path)
 
 
 # ---------- Main script ----------
 
-def main():
+def main(city: str = "Amsterdam", step_m: float = 100.0, threshold_m: float = 500.0):
+    from .downloader import download_boundary_geojson
+
     parks = extract_park_centroids()
     print(f"Loaded {len(parks)} parks (centroids)")
 
-    tree, meta = build_park_kdtree(parks)
+    try:
+        boundary = load_boundary_rings(str(download_boundary_geojson(city)))
+    except RuntimeError:
+        print("Boundary unavailable, sampling the parks' bounding box instead")
+        boundary = None
 
-    grid = make_grid_points(parks, step_deg=0.003)
+    tree = build_park_store_kdtree(parks)
 
-    accessible = 0
-    inaccessible = 0
-    inaccessible_pts: List[Tuple[float, float]] = []
+    lats, lons = make_grid_points(parks, step_m=step_m, boundary=boundary)
+    print(f"Sampling {len(lats)} grid points ({step_m:.0f} m spacing)")
 
-    for (lat, lon) in grid:
-        p = nearest_park(tree, meta, lat, lon)
-        d = haversine_m(lat, lon, p["lat"], p["lon"])
-        if d < 500:
-            accessible += 1
-        else:
-            inaccessible += 1
-            inaccessible_pts.append((lat, lon))
+    # One batched query for all grid points
+    idx = nearest_parks(tree, lats, lons)
+    dist = haversine_m_array(lats, lons, parks.parks["lat"][idx], parks.parks["lon"][idx])
+
+    is_accessible = dist < threshold_m
+    accessible = int(is_accessible.sum())
+    inaccessible = int((~is_accessible).sum())
 
     print(f"Accessible points: {accessible}")
     print(f"Inaccessible points: {inaccessible}")
@@ -194,7 +207,7 @@ def main():
     save_bar_chart(accessible, inaccessible, "outputs/accessibility_bar.png")
     print("Saved bar chart to outputs/accessibility_bar.png")
 
-    save_folium_map(parks, inaccessible_pts, "outputs/accessibility_map.html")
+    save_folium_map(parks, lats[~is_accessible], lons[~is_accessible], "outputs/accessibility_map.html")
     print("Saved map to outputs/accessibility_map.html")
 
 
@@ -208,14 +221,14 @@ if __name__ == "__main__":
     m = folium.Map(location=[52.37, 4.89], zoom_start=12)
 
     # Plot parks in green
-    for p in parks:
+    for i, (lat, lon) in enumerate(zip(parks.parks["lat"].tolist(), parks.parks["lon"].tolist())):
         folium.CircleMarker(
-            location=[p["lat"], p["lon"]],
+            location=[lat, lon],
             radius=3,
             color="green",
             fill=True,
             fill_opacity=0.7,
-            popup=p["name"] or "Park",
+            popup=parks.name(i),
         ).add_to(m)
 
     # Ensure outputs folder exists
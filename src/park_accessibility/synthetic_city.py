@@ -0,0 +1,115 @@
+"""
+Deterministic synthetic city for offline tests and benchmarks.
+
+A jittered grid walk graph with N nodes, M building polygons and K park
+polygons, shaped like the real inputs of the pipeline:
+- graph: osmnx-style MultiDiGraph (x/y node attributes, length on edges,
+  both directions, graph["crs"])
+- buildings, parks, boundary, edges: GeoDataFrames in EPSG:4326, like the
+  files written by get_ams_data()
+"""
+
+
+class SyntheticCity:
+    def __init__(
+        self,
+        n_nodes=2_500,
+        n_buildings=5_000,
+        n_parks=25,
+        seed=0,
+        spacing_m=80.0,
+        crs="EPSG:28992",
+        origin=(115_000.0, 480_000.0),
+        drop_edge_fraction=0.05
+    ):
+        import math
+
+        import geopandas as gpd
+        import networkx as nx
+        import numpy as np
+        import shapely
+
+        rng = np.random.default_rng(seed)
+        self.crs = crs
+
+        # -----------------------------------
+        # Walk graph: jittered grid
+        # -----------------------------------
+        cols = max(2, int(math.ceil(math.sqrt(n_nodes))))
+        rows = max(2, int(math.ceil(n_nodes / cols)))
+        ids = np.arange(rows * cols)[:n_nodes]
+        r, c = np.divmod(ids, cols)
+        x = origin[0] + c * spacing_m + rng.uniform(-0.2, 0.2, len(ids)) * spacing_m
+        y = origin[1] + r * spacing_m + rng.uniform(-0.2, 0.2, len(ids)) * spacing_m
+
+        pairs = [(i, i + 1) for i in ids if (i + 1) % cols and i + 1 < n_nodes]
+        pairs += [(i, i + cols) for i in ids if i + cols < n_nodes]
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        keep = rng.random(len(pairs)) >= drop_edge_fraction
+        pairs = pairs[keep]
+
+        G = nx.MultiDiGraph(crs=crs)
+        for i in ids:
+            G.add_node(int(i) + 1, x=float(x[i]), y=float(y[i]), street_count=4)
+        highways = np.array(["residential", "footway", "primary", "path", "steps"])
+        highway = highways[rng.choice(len(highways), len(pairs), p=[0.5, 0.25, 0.1, 0.1, 0.05])]
+        for k, (u, v) in enumerate(pairs):
+            length = float(math.hypot(x[u] - x[v], y[u] - y[v]))
+            attrs = {"osmid": k + 1, "length": length, "highway": str(highway[k]), "oneway": False}
+            G.add_edge(int(u) + 1, int(v) + 1, key=0, reversed=False, **attrs)
+            G.add_edge(int(v) + 1, int(u) + 1, key=0, reversed=True, **attrs)
+        self.graph = G
+
+        # -----------------------------------
+        # Buildings and parks
+        # -----------------------------------
+        minx, maxx = x.min(), x.max()
+        miny, maxy = y.min(), y.max()
+
+        bx = rng.uniform(minx, maxx, n_buildings)
+        by = rng.uniform(miny, maxy, n_buildings)
+        bw = rng.uniform(6, 25, n_buildings)
+        bh = rng.uniform(6, 25, n_buildings)
+        buildings = shapely.box(bx, by, bx + bw, by + bh)
+
+        px = rng.uniform(minx, maxx, n_parks)
+        py = rng.uniform(miny, maxy, n_parks)
+        pr = rng.uniform(40, 250, n_parks)
+        parks = shapely.buffer(shapely.points(px, py), pr, quad_segs=4)
+
+        self.buildings = gpd.GeoDataFrame(
+            {"building": ["yes"] * n_buildings},
+            geometry=buildings,
+            crs=crs
+        ).to_crs(epsg=4326)
+        self.parks = gpd.GeoDataFrame(
+            {"leisure": ["park"] * n_parks, "name": [f"Park {i}" for i in range(n_parks)]},
+            geometry=parks,
+            crs=crs
+        ).to_crs(epsg=4326)
+        self.boundary = gpd.GeoDataFrame(
+            {"naam": ["Synthetic"]},
+            geometry=[shapely.box(minx, miny, maxx, maxy)],
+            crs=crs
+        ).to_crs(epsg=4326)
+
+        edge_coords = np.stack([
+            np.column_stack([x[pairs[:, 0]], y[pairs[:, 0]]]),
+            np.column_stack([x[pairs[:, 1]], y[pairs[:, 1]]]),
+        ], axis=1)
+        edge_geoms = [shapely.LineString(line) for line in edge_coords]
+        self.edges = gpd.GeoDataFrame(
+            {"u": pairs[:, 0] + 1, "v": pairs[:, 1] + 1, "highway": highway},
+            geometry=edge_geoms,
+            crs=crs
+        ).to_crs(epsg=4326)
+
+    def park_records(self):
+        """
+        Parks as dicts with keys name, lat, lon (the KD-tree input).
+        """
+        centroids = self.parks.to_crs(self.crs).geometry.centroid.to_crs(epsg=4326)
+        return [
+            {"name": name, "lat": float(pt.y), "lon": float(pt.x)}
+            for name, pt in zip(self.parks["name"], centroids)
+        ]
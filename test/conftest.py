@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+import pytest
+
+from park_accessibility.synthetic_city import SyntheticCity
+from park_accessibility.NA_park_accessibility.NA_analysis import ParkAccessibility
+
+
+@pytest.fixture
+def snapped_city():
+    """
+    Factory for the usual offline setup: SyntheticCity -> ParkAccessibility
+    -> snapped building centroids and park nodes.
+
+        c = snapped_city(n_nodes=400, n_buildings=200, n_parks=5, seed=0)
+        c.city, c.model, c.buildings, c.park_nodes
+
+    Pass city= to reuse an existing city, graph= to use a modified walk
+    graph and slim=True for a slim model.
+    """
+
+    def make(city=None, graph=None, slim=False, **city_kwargs):
+        if city is None:
+            city = SyntheticCity(**city_kwargs)
+        model = ParkAccessibility(graph=city.graph if graph is None else graph, slim=slim)
+        buildings, park_nodes = model.generate_building_centroids_and_snap(city.buildings, city.parks)
+        return SimpleNamespace(city=city, model=model, buildings=buildings, park_nodes=park_nodes)
+
+    return make
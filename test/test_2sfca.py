@@ -0,0 +1,23 @@
+def test_2sfca_matches_networkx_catchments(snapped_city):
+    import networkx as nx
+    import numpy as np
+    import osmnx as ox
+
+    c = snapped_city(n_nodes=400, n_buildings=200, n_parks=5, seed=3)
+    city, model, buildings = c.city, c.model, c.buildings
+    scored, parks = model.compute_2sfca(buildings, city.parks, max_distance=600, n_jobs=2)
+
+    # Brute force: one networkx Dijkstra per park
+    parks_m = city.parks.to_crs(model.target_crs)
+    centroids = parks_m.geometry.centroid
+    nodes = ox.nearest_nodes(model.G, centroids.x, centroids.y)
+    reach = [nx.single_source_dijkstra_path_length(model.G, n, cutoff=600, weight="length") for n in nodes]
+    demand = buildings["footprint_m2"].to_numpy()
+    in_reach = np.array([[node in r for r in reach] for node in buildings["nearest_node"]])
+    ratio = parks_m.geometry.area.to_numpy() / np.maximum(in_reach.T @ demand, 1e-12)
+    ratio[in_reach.sum(axis=0) == 0] = 0
+
+    np.testing.assert_allclose(parks["supply_ratio"], ratio)
+    np.testing.assert_allclose(scored["sfca_score"], in_reach @ ratio)
+    np.testing.assert_array_equal(scored["sfca_parks"], in_reach.sum(axis=1))
+    assert (scored["sfca_score"] > 0).any()
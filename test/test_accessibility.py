@@ -1,4 +1,4 @@
-from park_access.geo import haversine_m
+from park_accessibility.kd_park_accessibility.geo import haversine_m
 
 
 def test_accessibility_threshold():
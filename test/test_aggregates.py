@@ -0,0 +1,92 @@
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import Point, box
+
+from park_accessibility.NA_park_accessibility.NA_aggregates import AreaAggregates, distance_bins
+
+
+def _buildings():
+    # Three buildings in area A (x < 100), two in area B, one outside both
+    xs = [10, 20, 30, 110, 120, 500]
+    dist = [50.0, 250.0, np.nan, 90.0, 1400.0, 10.0]
+    return gpd.GeoDataFrame(
+        {"dist_to_park_m": dist},
+        geometry=[Point(x, 5) for x in xs],
+        index=[11, 12, 13, 21, 22, 99],
+        crs="EPSG:28992",
+    )
+
+
+def _areas():
+    return {
+        "buurt": gpd.GeoDataFrame(
+            {"code": ["A", "B"], "name": ["Noord", "Zuid"]},
+            geometry=[box(0, 0, 100, 10), box(100, 0, 200, 10)],
+            crs="EPSG:28992",
+        )
+    }
+
+
+def test_distance_bins():
+    bins = distance_bins([0, 100, 100.5, 1500, 1501, np.nan], (0, 100, 1500))
+    assert bins.tolist() == [0, 0, 1, 1, 2, 2]
+
+
+def test_build_coverage_and_percentiles():
+    agg = AreaAggregates.build(_buildings(), _areas())
+    table = agg.table("buurt", q=(50,))
+
+    assert table["buildings"].tolist() == [3, 2]
+    assert table["accessible"].tolist() == [2, 2]
+    np.testing.assert_allclose(table["coverage"], [2 / 3, 1.0])
+    total, accessible, _ = agg.coverage("buurt", within=100)
+    assert accessible.tolist() == [1, 1]
+    # Median of {50, 250, unreachable} falls in the (200, 300] bin
+    assert 200 < table["p50_m"][0] <= 300
+
+
+def test_incremental_update_touches_only_affected_areas(tmp_path):
+    buildings = _buildings()
+    agg = AreaAggregates.build(buildings, _areas())
+    before_b = agg.levels["buurt"]["hist"][1].copy()
+
+    affected = agg.update([13], [120.0])
+    assert affected["buurt"].tolist() == ["A"]
+    np.testing.assert_array_equal(agg.levels["buurt"]["hist"][1], before_b)
+
+    # Same result as rebuilding from scratch
+    buildings.loc[13, "dist_to_park_m"] = 120.0
+    rebuilt = AreaAggregates.build(buildings, _areas())
+    np.testing.assert_array_equal(agg.levels["buurt"]["hist"], rebuilt.levels["buurt"]["hist"])
+
+    path = agg.save(str(tmp_path / "agg.npz"))
+    loaded = AreaAggregates.load(path)
+    assert loaded.refresh(buildings)["buurt"].tolist() == []
+    np.testing.assert_array_equal(loaded.levels["buurt"]["hist"], rebuilt.levels["buurt"]["hist"])
+
+
+def test_refresh_removes_missing_buildings_and_rejects_new_ones():
+    import pytest
+
+    buildings = _buildings()
+    agg = AreaAggregates.build(buildings, _areas())
+
+    # Building 21 (area B) was demolished
+    remaining = buildings.drop(index=21)
+    affected = agg.refresh(remaining)
+    assert affected["buurt"].tolist() == ["B"]
+    rebuilt = AreaAggregates.build(remaining, _areas())
+    np.testing.assert_array_equal(agg.levels["buurt"]["hist"], rebuilt.levels["buurt"]["hist"])
+    assert agg.table("buurt")["buildings"].tolist() == [3, 1]
+
+    new = remaining.copy()
+    new.loc[30] = new.loc[11]
+    with pytest.raises(KeyError):
+        agg.refresh(new)
+
+
+def test_building_on_shared_border_counts_once():
+    border = gpd.GeoDataFrame({"dist_to_park_m": [10.0]}, geometry=[Point(100, 5)], index=[1], crs="EPSG:28992")
+    agg = AreaAggregates.build(border, _areas())
+    assert agg.levels["buurt"]["hist"].sum() == 1
+    assert agg.levels["buurt"]["assignment"].tolist() == [0]
@@ -1,5 +1,5 @@
 from fastapi.testclient import TestClient
-from park_access.service import app
+from park_accessibility.kd_park_accessibility.service import app
 
 client = TestClient(app)
 
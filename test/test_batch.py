@@ -0,0 +1,46 @@
+import numpy as np
+
+from park_accessibility.NA_park_accessibility.NA_batch import (
+    CityCheckpoint,
+    accessibility_for_thresholds,
+    memory_aware_workers,
+)
+from park_accessibility.NA_park_accessibility.NA_data_processing import city_slug
+
+
+def test_city_slug():
+    assert city_slug("'s-Hertogenbosch") == "s_hertogenbosch"
+    assert city_slug("Den Haag") == "den_haag"
+
+
+def test_memory_aware_workers():
+    assert memory_aware_workers(10, worker_mem_gb=4, max_workers=8, available_gb=13) == 3
+    assert memory_aware_workers(2, worker_mem_gb=4, max_workers=8, available_gb=64) == 2
+    # Always at least one worker, even when memory looks short
+    assert memory_aware_workers(5, worker_mem_gb=4, max_workers=8, available_gb=1) == 1
+
+
+def test_checkpoint_resumes_and_detects_missing_outputs(tmp_path):
+    out = tmp_path / "parks.gpkg"
+    out.write_text("x")
+
+    ckpt = CityCheckpoint(str(tmp_path))
+    ckpt.mark("parks", [str(out)], rows=3)
+
+    reloaded = CityCheckpoint(str(tmp_path))
+    assert reloaded.done("parks")
+    assert not reloaded.done("graph")
+
+    out.unlink()
+    assert not reloaded.done("parks")
+
+
+def test_thresholds_from_one_dijkstra_match_separate_runs(snapped_city):
+    c = snapped_city(n_nodes=400, n_buildings=200, n_parks=4, seed=2)
+    model, buildings, park_nodes = c.model, c.buildings, c.park_nodes
+
+    results = accessibility_for_thresholds(model, buildings, park_nodes, [300, 800])
+    for t in (300, 800):
+        expected = model.compute_accessibility(buildings, park_nodes, max_distance=t)
+        np.testing.assert_array_equal(results[t][f"park_access_{t}m"], expected[f"park_access_{t}m"])
+        np.testing.assert_allclose(results[t]["dist_to_park_m"], expected["dist_to_park_m"])
@@ -1,5 +1,5 @@
 import requests
-from park_access.downloader import download_parks_geojson
+from park_accessibility.kd_park_accessibility.downloader import download_parks_geojson
 
 
 def test_downloader_timeout(monkeypatch):
@@ -12,3 +12,31 @@ def test_downloader_timeout(monkeypatch):
         download_parks_geojson("Amsterdam", out_path="data/test.geojson", force=True)
     except Exception:
         assert True
+
+
+def test_boundary_rings_are_stitched(monkeypatch, tmp_path):
+    import json
+    from park_accessibility.kd_park_accessibility.downloader import download_boundary_geojson
+
+    def way(*pts):
+        return {"type": "way", "role": "outer", "geometry": [{"lon": x, "lat": y} for x, y in pts]}
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            # Square split into two unordered ways, one reversed
+            return {"elements": [{"members": [
+                way((0, 0), (1, 0), (1, 1)),
+                way((0, 0), (0, 1), (1, 1)),
+            ]}]}
+
+    monkeypatch.setattr(requests, "post", lambda *args, **kwargs: FakeResponse())
+
+    out = download_boundary_geojson("Testville", out_path=str(tmp_path / "b.geojson"))
+    geom = json.loads(out.read_text())["features"][0]["geometry"]
+
+    assert geom["type"] == "MultiPolygon"
+    ring = geom["coordinates"][0][0]
+    assert len(ring) == 5 and ring[0] == ring[-1]
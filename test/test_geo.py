@@ -1,4 +1,4 @@
-from park_access.geo import haversine_m
+from park_accessibility.kd_park_accessibility.geo import haversine_m
 
 
 def test_haversine_known_distance():
@@ -8,3 +8,44 @@ def test_haversine_known_distance():
     distance = haversine_m(lat1, lon1, lat2, lon2)
 
     assert 600 < distance < 900
+
+
+def test_haversine_array_matches_scalar():
+    import numpy as np
+    from park_accessibility.kd_park_accessibility.geo import haversine_m_array
+
+    lats = np.array([52.3791, 52.36, 52.0])
+    lons = np.array([4.9003, 4.88, 5.0])
+    expected = [haversine_m(lat, lon, 52.3731, 4.8922) for lat, lon in zip(lats, lons)]
+
+    assert np.allclose(haversine_m_array(lats, lons, 52.3731, 4.8922), expected)
+
+
+def test_scanline_mask_square_with_hole():
+    import numpy as np
+    from park_accessibility.kd_park_accessibility.geo import scanline_mask
+
+    outer = np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]], dtype=float)
+    hole = np.array([[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]], dtype=float)
+    # 1 x 1 cells covering (-1, -1) .. (11, 11), row 0 at the top
+    mask = scanline_mask([outer, hole], (-1.0, 11.0), 1.0, (12, 12))
+
+    assert mask.sum() == 100 - 4
+    assert mask[1, 1] and mask[10, 10]
+    assert not mask[0, 0] and not mask[6, 5]
+
+
+def test_make_grid_points_spacing_in_meters():
+    import numpy as np
+    from park_accessibility.kd_park_accessibility.geo import haversine_m_array
+    from park_accessibility.kd_park_accessibility.viz import make_grid_points
+
+    # ~1.4 km x 1.1 km box around the Dam
+    ring = np.array([[4.88, 52.37], [4.90, 52.37], [4.90, 52.38], [4.88, 52.38], [4.88, 52.37]])
+    lats, lons = make_grid_points(None, step_m=100.0, boundary=[ring])
+
+    assert 100 < len(lats) < 200
+    assert (lons >= 4.88).all() and (lons <= 4.90).all() and (lats >= 52.37).all() and (lats <= 52.38).all()
+    # Horizontal neighbours are 100 m apart
+    row = np.isclose(lats, lats[0])
+    np.testing.assert_allclose(haversine_m_array(lats[row][:1], lons[row][:1], lats[row][1], lons[row][1]), 100.0, rtol=1e-3)
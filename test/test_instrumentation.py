@@ -0,0 +1,30 @@
+import json
+
+from park_accessibility.NA_park_accessibility.NA_instrumentation import StageRecorder
+
+
+def test_disabled_recorder_is_a_no_op():
+    rec = StageRecorder(enabled=False)
+    with rec.stage("dijkstra"):
+        pass
+    assert rec.stages == []
+
+
+def test_nested_stages_and_report(tmp_path):
+    rec = StageRecorder(enabled=True, profile_stages={"inner"}, profile_dir=str(tmp_path / "prof"))
+    with rec.stage("outer"):
+        with rec.stage("inner"):
+            data = [0] * 200_000
+        del data
+
+    inner, outer = rec.stages
+    assert (inner["path"], outer["path"]) == ("outer/inner", "outer")
+    assert outer["wall_s"] >= inner["wall_s"]
+    # The child's allocation peak is carried up to the parent
+    assert outer["py_peak_mb"] >= inner["py_peak_mb"] >= 1.0
+    assert (tmp_path / "prof" / "outer.inner.prof").exists()
+
+    report = json.loads(open(rec.write_report(str(tmp_path / "run.json"))).read())
+    assert report["total_wall_s"] == outer["wall_s"]
+    assert [s["name"] for s in report["stages"]] == ["inner", "outer"]
+    assert rec.summary().startswith("outer")
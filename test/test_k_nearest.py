@@ -0,0 +1,19 @@
+def test_k_nearest_parks_matches_per_park_dijkstra(snapped_city):
+    import networkx as nx
+    import numpy as np
+    import osmnx as ox
+
+    c = snapped_city(n_nodes=400, n_buildings=150, n_parks=8, seed=4)
+    city, model, buildings = c.city, c.model, c.buildings
+    park_ids, distances = model.compute_k_nearest_parks(buildings, city.parks, k=3, max_distance=800)
+
+    assert park_ids.shape == distances.shape == (150, 3)
+
+    centroids = city.parks.to_crs(model.target_crs).geometry.centroid
+    nodes = ox.nearest_nodes(model.G, centroids.x, centroids.y)
+    reach = [nx.single_source_dijkstra_path_length(model.G, n, cutoff=800, weight="length") for n in nodes]
+    for b, node in enumerate(buildings["nearest_node"]):
+        expected = sorted(r[node] for r in reach if node in r)[:3]
+        got = distances[b][park_ids[b] >= 0]
+        np.testing.assert_allclose(got, expected, rtol=1e-5)
+        assert len(set(park_ids[b][park_ids[b] >= 0])) == len(got)
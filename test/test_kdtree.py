@@ -1,4 +1,4 @@
-from park_access.kdtree import build_park_kdtree, nearest_park
+from park_accessibility.kd_park_accessibility.kdtree import build_park_kdtree, nearest_park
 
 
 def test_kdtree_nearest():
@@ -10,3 +10,16 @@ def test_kdtree_nearest():
     tree, meta = build_park_kdtree(parks)
     p = nearest_park(tree, meta, 0.2, 0.1)
     assert p["name"] == "A"
+
+
+def test_kdtree_nearest_batch():
+    from park_accessibility.kd_park_accessibility.kdtree import nearest_parks
+
+    parks = [
+        {"name": "A", "lat": 0.0, "lon": 0.0},
+        {"name": "B", "lat": 0.0, "lon": 10.0},
+        {"name": "C", "lat": 10.0, "lon": 0.0},
+    ]
+    tree, meta = build_park_kdtree(parks)
+    idx = nearest_parks(tree, [0.2, 0.1, 9.0], [0.1, 9.0, 1.0])
+    assert [meta[i]["name"] for i in idx] == ["A", "B", "C"]
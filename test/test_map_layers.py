@@ -0,0 +1,30 @@
+import json
+
+import geopandas as gpd
+from shapely.geometry import LineString
+
+from park_accessibility.NA_park_accessibility.NA_map_layers import (
+    MapLayerPreprocessor,
+    coordinate_decimals,
+)
+
+
+def test_coordinate_decimals_grow_with_zoom():
+    assert coordinate_decimals(10) < coordinate_decimals(14) <= coordinate_decimals(18)
+
+
+def test_prepare_drops_properties_and_simplifies(tmp_path):
+    # Nearly straight street with sub-meter wiggles
+    line = LineString([(121000 + i, 487000 + (0.05 if i % 2 else 0)) for i in range(100)])
+    gdf = gpd.GeoDataFrame(
+        {"osmid": [1], "highway": ["footway"]}, geometry=[line], crs=28992
+    )
+
+    prep = MapLayerPreprocessor(detail_zoom=16, cache_dir=str(tmp_path))
+    text = prep.prepare(gdf, "streets")
+    feature = json.loads(text)["features"][0]
+
+    assert feature["properties"] == {}
+    assert len(feature["geometry"]["coordinates"]) == 2
+    assert len(list(tmp_path.iterdir())) == 1
+    assert MapLayerPreprocessor(detail_zoom=16, cache_dir=str(tmp_path)).prepare(gdf, "streets") == text
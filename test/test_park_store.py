@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+
+from park_accessibility.kd_park_accessibility.park_store import build_park_store, load_park_store
+
+
+def _write_parks(path):
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"osm_id": 1, "name": "Square"},
+            "geometry": {"type": "Polygon", "coordinates": [[[4.0, 52.0], [4.002, 52.0], [4.002, 52.001], [4.0, 52.001], [4.0, 52.0]]]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"osm_id": 2, "name": None},
+            "geometry": {"type": "Polygon", "coordinates": [[[5.0, 51.0], [5.0, 51.0]]]},
+        },
+    ]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def test_park_store_roundtrip(tmp_path):
+    geojson = tmp_path / "parks.geojson"
+    _write_parks(geojson)
+
+    store = load_park_store(str(build_park_store(str(geojson), str(tmp_path / "store"))))
+
+    assert len(store) == 2
+    assert store.name(0) == "Square"
+    assert store.name(1) == "Unnamed park"
+    assert np.allclose([store.parks["lat"][0], store.parks["lon"][0]], [52.0005, 4.001])
+    # ~137 m x ~111 m
+    assert 14000 < store.parks["area_m2"][0] < 16000
+    # Degenerate ring falls back to the vertex average
+    assert store.parks["lon"][1] == 5.0 and store.parks["area_m2"][1] == 0.0
+    assert store.ring(0).shape == (5, 2)
+    assert store.to_records()[0] == {"name": "Square", "lat": store.parks["lat"][0], "lon": store.parks["lon"][0]}
+
+
+def test_park_store_rebuild_replaces_directory(tmp_path):
+    geojson = tmp_path / "parks.geojson"
+    _write_parks(geojson)
+    out = tmp_path / "store"
+
+    old = load_park_store(str(build_park_store(str(geojson), str(out))))
+    store = load_park_store(str(build_park_store(str(geojson), str(out))))
+
+    # Readers of the previous store keep their mapping
+    assert old.name(0) == "Square" and store.name(0) == "Square"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["parks.geojson", "store"]
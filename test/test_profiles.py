@@ -0,0 +1,60 @@
+import networkx as nx
+import numpy as np
+
+from park_accessibility.NA_park_accessibility.NA_profiles import GraphTopology, WalkingProfile
+
+
+def _line_graph():
+    # 1 -(100 m primary)-> 2 -(50 m steps)-> 3, node 2 is a crossing,
+    # plus a parallel 1 -> 2 footway of 120 m
+    G = nx.MultiDiGraph()
+    G.add_node(1)
+    G.add_node(2, highway="crossing")
+    G.add_node(3)
+    G.add_edge(1, 2, key=0, length=100.0, highway="primary")
+    G.add_edge(1, 2, key=1, length=120.0, highway="footway")
+    G.add_edge(2, 3, key=0, length=50.0, highway="steps")
+    return G
+
+
+def test_profiles_share_topology_and_pick_cheapest_parallel_edge():
+    topo = GraphTopology(_line_graph())
+    assert len(topo.indices) == 2
+
+    np.testing.assert_allclose(topo.costs("default"), [100.0, 50.0])
+    busy = WalkingProfile("busy", highway_factors={"primary": 1.5}, crossing_penalty_m=10)
+    # primary costs 150 + 10, the parallel footway 120 + 10
+    np.testing.assert_allclose(topo.costs(busy), [130.0, 50.0])
+
+    csr = topo.csr({"name": "step_free", "highway_factors": {"steps": None}})
+    assert np.shares_memory(csr.indices, topo.indices) and np.shares_memory(csr.indptr, topo.indptr)
+    assert np.isinf(csr.data[1])
+
+
+def test_accessibility_profiles_on_synthetic_city(snapped_city):
+    c = snapped_city(n_nodes=400, n_buildings=200, n_parks=4, seed=5)
+    model, buildings, park_nodes = c.model, c.buildings, c.park_nodes
+
+    result = model.compute_accessibility_profiles(
+        buildings, park_nodes, profiles=("default", "slow", "step_free"), max_distance=800
+    )
+    expected = model.compute_accessibility(buildings, park_nodes, max_distance=800)
+
+    np.testing.assert_allclose(result["dist_to_park_m_default"], expected["dist_to_park_m"])
+    np.testing.assert_array_equal(result["park_access_800m_default"], expected["park_access_800m"])
+
+    slow = result["dist_to_park_m_slow"].dropna()
+    np.testing.assert_allclose(slow, 1.4 * result.loc[slow.index, "dist_to_park_m_default"])
+    assert result["park_access_800m_slow"].sum() < result["park_access_800m_default"].sum()
+    step_free = result["dist_to_park_m_step_free"].fillna(np.inf)
+    assert (step_free >= result["dist_to_park_m_default"].fillna(np.inf)).all()
+
+
+def test_batched_profiles_match_separate_runs(snapped_city):
+    topo = snapped_city(n_nodes=300, n_buildings=10, n_parks=3, seed=2).model.topology()
+    sources = np.arange(0, topo.n_nodes, 50)
+    profiles = ("default", "slow", "avoid_busy_roads", "step_free")
+
+    batched = topo.multi_profile_distances(sources, profiles, limit=700)
+    for name in profiles:
+        np.testing.assert_array_equal(batched[name], topo.multi_profile_distances(sources, [name], 700)[name])
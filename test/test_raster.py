@@ -0,0 +1,30 @@
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import Point, box
+
+from park_accessibility.NA_park_accessibility.NA_raster import (
+    AccessibilityRaster,
+    rasterize_polygons,
+)
+
+
+def test_rasterize_polygons_cell_centers():
+    # 10 m cells, square covering x 20..50, y 60..90 of a 100 x 100 m grid
+    mask = rasterize_polygons(box(20, 60, 50, 90), origin=(0, 100), cell_size=10, shape=(10, 10))
+    assert mask.sum() == 9
+    assert mask[1:4, 2:5].all()
+
+
+def test_from_buildings_keeps_min_per_cell():
+    gdf = gpd.GeoDataFrame(
+        {"dist_to_park_m": [300.0, 120.0, np.nan]},
+        geometry=[Point(5, 95), Point(6, 94), Point(55, 45)],
+        crs=28992,
+    )
+    raster = AccessibilityRaster.from_buildings(
+        gdf, cell_size=10, boundary_gdf=gpd.GeoDataFrame(geometry=[box(0, 0, 100, 100)], crs=28992)
+    )
+    assert raster.shape == (10, 10)
+    assert raster.values[0, 0] == 120.0
+    assert raster.values[5, 5] == 2000.0
+    assert np.isnan(raster.values[9, 9])
@@ -0,0 +1,56 @@
+import numpy as np
+
+from park_accessibility.synthetic_city import SyntheticCity
+
+
+def test_slim_graph_gives_identical_results(snapped_city):
+    f = snapped_city(n_nodes=900, n_buildings=300, n_parks=5, seed=7)
+    s = snapped_city(city=f.city, slim=True)
+    city, full, slim = f.city, f.model, s.model
+    b_full, nodes_full, b_slim, nodes_slim = f.buildings, f.park_nodes, s.buildings, s.park_nodes
+    assert slim.G.number_of_edges() * 2 <= full.G.number_of_edges()
+    assert (b_full["nearest_node"] == b_slim["nearest_node"]).all()
+    assert sorted(nodes_full) == sorted(nodes_slim)
+
+    expected = full.compute_accessibility(b_full, nodes_full, max_distance=1000)
+    result = slim.compute_accessibility(b_slim, nodes_slim, max_distance=1000)
+    assert slim.search_graph(set(b_slim["nearest_node"]) | set(nodes_slim)).number_of_nodes() < slim.G.number_of_nodes()
+
+    np.testing.assert_array_equal(result["park_access_1000m"], expected["park_access_1000m"])
+    np.testing.assert_allclose(result["dist_to_park_m"], expected["dist_to_park_m"], rtol=1e-9)
+
+    # The sparse modes see the same (two-way) network
+    s_full, _ = full.compute_2sfca(b_full, city.parks, max_distance=600, n_jobs=1)
+    s_slim, _ = slim.compute_2sfca(b_slim, city.parks, max_distance=600, n_jobs=1)
+    np.testing.assert_allclose(s_slim["sfca_score"], s_full["sfca_score"])
+
+
+def test_profiles_on_slim_graph_match_full_graph(snapped_city):
+    city = SyntheticCity(n_nodes=600, n_buildings=200, n_parks=4, seed=6)
+    graph = city.graph.copy()
+    # Crossings, and parallel edges whose highway differs from the original
+    for node in list(graph.nodes)[::7]:
+        graph.nodes[node]["highway"] = "crossing"
+    for u, v, data in list(graph.edges(data=True))[::11]:
+        hw = "steps" if data["highway"] != "steps" else "footway"
+        graph.add_edge(u, v, length=data["length"] * 0.8, highway=hw)
+        graph.add_edge(v, u, length=data["length"] * 0.8, highway=hw)
+
+    profiles = ("default", "slow", "avoid_busy_roads", "step_free")
+
+    results = []
+    for slim in (False, True):
+        c = snapped_city(city=city, graph=graph, slim=slim)
+        results.append(c.model.compute_accessibility_profiles(c.buildings, c.park_nodes, profiles, max_distance=800))
+    expected, result = results
+
+    for name in profiles:
+        np.testing.assert_allclose(
+            result[f"dist_to_park_m_{name}"].fillna(np.inf),
+            expected[f"dist_to_park_m_{name}"].fillna(np.inf),
+            rtol=1e-9
+        )
+    assert not np.allclose(
+        expected["dist_to_park_m_avoid_busy_roads"].fillna(np.inf),
+        expected["dist_to_park_m_default"].fillna(np.inf)
+    )
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _loaded_after_import(module, heavy):
+    code = f"import sys, {module}; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return out.stdout.strip()
+
+
+def test_na_modules_import_without_heavy_dependencies():
+    heavy = ["osmnx", "networkx", "geopandas", "requests", "folium", "matplotlib", "scipy"]
+    for module in (
+        "park_accessibility.NA_park_accessibility.NA_analysis",
+        "park_accessibility.NA_park_accessibility.NA_data_processing",
+        "park_accessibility.kd_park_accessibility.kdtree",
+    ):
+        assert _loaded_after_import(module, heavy) == "", module
+
+
+def test_service_and_viz_import_without_heavy_dependencies():
+    heavy = ["geopandas", "osmnx", "folium", "matplotlib", "networkx"]
+    for module in (
+        "park_accessibility.kd_park_accessibility.service",
+        "park_accessibility.kd_park_accessibility.viz",
+    ):
+        assert _loaded_after_import(module, heavy) == "", module
+
+
+def test_serve_reports_failing_worker():
+    code = (
+        "import park_accessibility.kd_park_accessibility.serve as s\n"
+        "s.preload = lambda city: None\n"
+        "def boom(sock, log_level): raise RuntimeError('worker startup failed')\n"
+        "s._run_worker = boom\n"
+        "raise SystemExit(s.serve(port=0, workers=1))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=60)
+    assert out.returncode == 1
+    assert "RuntimeError: worker startup failed" in out.stderr
@@ -0,0 +1,20 @@
+from park_accessibility.synthetic_city import SyntheticCity
+
+
+def test_synthetic_city_is_deterministic():
+    a = SyntheticCity(n_nodes=100, n_buildings=50, n_parks=3, seed=1)
+    b = SyntheticCity(n_nodes=100, n_buildings=50, n_parks=3, seed=1)
+
+    assert a.graph.number_of_nodes() == 100
+    assert sorted(a.graph.edges(keys=True)) == sorted(b.graph.edges(keys=True))
+    assert a.buildings.geometry.equals(b.buildings.geometry)
+    assert a.parks.geometry.equals(b.parks.geometry)
+
+
+def test_accessibility_offline(snapped_city):
+    c = snapped_city(n_nodes=400, n_buildings=200, n_parks=5, seed=0)
+    result = c.model.compute_accessibility(c.buildings, c.park_nodes, max_distance=1500)
+
+    assert len(result) == 200
+    assert result["park_access_1500m"].any()
+    assert (result["dist_to_park_m"].dropna() <= 1500).all()
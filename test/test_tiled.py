@@ -0,0 +1,101 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from pyproj import Transformer
+from shapely.geometry import box
+
+from park_accessibility.synthetic_city import SyntheticCity
+from park_accessibility.NA_park_accessibility.NA_tiled import TiledAccessibility, load_tiled_results
+
+
+def _tiled_inputs(city, tmp_path, parks=None):
+    buildings_path = str(tmp_path / "buildings.gpkg")
+    parks_path = str(tmp_path / "parks.gpkg")
+    city.buildings.to_file(buildings_path)
+    (city.parks if parks is None else parks).to_file(parks_path)
+
+    to_rd = Transformer.from_crs("EPSG:4326", city.crs, always_xy=True)
+    loaded = []
+
+    def graph_loader(bbox):
+        minx, miny, maxx, maxy = to_rd.transform_bounds(*bbox)
+        nodes = [
+            n for n, d in city.graph.nodes(data=True)
+            if minx <= d["x"] <= maxx and miny <= d["y"] <= maxy
+        ]
+        loaded.append(len(nodes))
+        return city.graph.subgraph(nodes).copy()
+
+    return buildings_path, parks_path, graph_loader, loaded
+
+
+def _assert_matches_whole_city(out_dir, expected, max_distance):
+    result = load_tiled_results(out_dir)
+    assert len(result["building_fid"]) == len(expected)
+    assert len(set(result["building_fid"].tolist())) == len(expected)
+
+    # GPKG feature ids start at 1
+    order = np.argsort(result["building_fid"])
+    np.testing.assert_array_equal(result["park_access"][order], expected[f"park_access_{max_distance}m"].to_numpy())
+    np.testing.assert_allclose(
+        result["dist_to_park_m"][order], expected["dist_to_park_m"].to_numpy(dtype=float), rtol=1e-6
+    )
+
+
+def test_tiled_run_matches_whole_city(tmp_path, snapped_city):
+    c = snapped_city(n_nodes=900, n_buildings=300, n_parks=6, seed=6)
+    buildings_path, parks_path, graph_loader, loaded = _tiled_inputs(c.city, tmp_path)
+
+    tiled = TiledAccessibility(
+        buildings_path, parks_path, out_dir=str(tmp_path / "out"),
+        tile_size_m=1000, max_distance=400, graph_loader=graph_loader
+    )
+    manifest = tiled.run()
+    assert len(manifest["tiles"]) > 4
+    assert max(loaded) < c.city.graph.number_of_nodes()
+
+    expected = c.model.compute_accessibility(c.buildings, c.park_nodes, max_distance=400)
+    _assert_matches_whole_city(str(tmp_path / "out"), expected, 400)
+
+    # A second run resumes from the manifest and loads nothing
+    loaded.clear()
+    tiled.run()
+    assert loaded == []
+
+
+def test_large_park_across_tiles_matches_whole_city(tmp_path, snapped_city):
+    city = SyntheticCity(n_nodes=900, n_buildings=300, n_parks=3, seed=6)
+    # A 60 m wide park across the full width of the city: it reaches into
+    # the halo of the outer tiles, but it is snapped at its centroid
+    minx, miny, maxx, maxy = city.buildings.to_crs(city.crs).total_bounds
+    mid = (miny + maxy) / 2
+    strip = gpd.GeoDataFrame(
+        {"leisure": ["park"], "name": ["Strip"]}, geometry=[box(minx, mid - 30, maxx, mid + 30)], crs=city.crs
+    ).to_crs(city.parks.crs)
+    parks = pd.concat([city.parks, strip], ignore_index=True)
+    city.parks = parks
+
+    c = snapped_city(city=city)
+    buildings_path, parks_path, graph_loader, _ = _tiled_inputs(city, tmp_path, parks)
+    TiledAccessibility(
+        buildings_path, parks_path, out_dir=str(tmp_path / "out"),
+        tile_size_m=500, max_distance=200, graph_loader=graph_loader
+    ).run()
+
+    expected = c.model.compute_accessibility(c.buildings, c.park_nodes, max_distance=200)
+    _assert_matches_whole_city(str(tmp_path / "out"), expected, 200)
+
+
+def test_restart_with_other_parameters_is_refused(tmp_path):
+    city = SyntheticCity(n_nodes=200, n_buildings=40, n_parks=2, seed=1)
+    buildings_path, parks_path, graph_loader, _ = _tiled_inputs(city, tmp_path)
+    out_dir = str(tmp_path / "out")
+
+    TiledAccessibility(buildings_path, parks_path, out_dir=out_dir, max_distance=300, graph_loader=graph_loader).run()
+    with pytest.raises(ValueError, match="max_distance"):
+        TiledAccessibility(buildings_path, parks_path, out_dir=out_dir, max_distance=500, graph_loader=graph_loader).run()
+    with pytest.raises(ValueError, match="profile"):
+        TiledAccessibility(
+            buildings_path, parks_path, out_dir=out_dir, max_distance=300, graph_loader=graph_loader, profile="slow"
+        ).run()
@@ -0,0 +1,65 @@
+from park_accessibility.kd_park_accessibility.tiles import TileArchive, TileArchiveWriter, lonlat_to_tile
+
+
+def test_tile_archive_roundtrip(tmp_path):
+    path = tmp_path / "tiles.pkt"
+    with TileArchiveWriter(str(path), metadata={"max_zoom": 16}) as w:
+        w.add(16, 33656, 21534, b"tile-a")
+        w.add(12, 2103, 1345, b"tile-b")
+
+    archive = TileArchive(str(path))
+    assert len(archive) == 2
+    assert archive.metadata["max_zoom"] == 16
+    assert bytes(archive.get(12, 2103, 1345)) == b"tile-b"
+    assert archive.get(12, 0, 0) is None
+
+
+def test_lonlat_to_tile():
+    # Amsterdam Centraal
+    assert lonlat_to_tile(4.9003, 52.3791, 12) == (2103, 1345)
+
+
+def test_tile_export_keeps_property_text(tmp_path):
+    import gzip
+    import json
+
+    import geopandas as gpd
+    from shapely.geometry import LineString, Point, box
+
+    from park_accessibility.NA_park_accessibility.NA_tiles import TilePyramidExporter
+
+    crs = "EPSG:28992"
+    buildings = gpd.GeoDataFrame(
+        {"dist_to_park_m": [120.0], "park_access_1500m": [True]}, geometry=[Point(121000, 487000)], crs=crs
+    )
+    streets = gpd.GeoDataFrame({"highway": ["footway"]}, geometry=[LineString([(120900, 487000), (121100, 487000)])], crs=crs)
+    parks = gpd.GeoDataFrame({"name": ["Versie 2.0, noord"]}, geometry=[box(121050, 487050, 121150, 487150)], crs=crs)
+
+    path = tmp_path / "tiles.pkt"
+    TilePyramidExporter(min_zoom=16, max_zoom=16, detail_zoom=16).export(buildings, streets, parks, out_path=str(path))
+
+    center = parks.geometry.centroid.to_crs(4326)[0]
+    tile = TileArchive(str(path)).get(16, *lonlat_to_tile(center.x, center.y, 16))
+    park = json.loads(gzip.decompress(bytes(tile)))["parks"][0]
+    assert park["p"]["name"] == "Versie 2.0, noord"
+    assert all(isinstance(v, int) for ring in park["g"]["coordinates"] for pt in ring for v in pt)
+
+
+def test_tiles_endpoint_serves_gzip_slices(tmp_path, monkeypatch):
+    import gzip
+
+    from fastapi.testclient import TestClient
+    from park_accessibility.kd_park_accessibility import service
+
+    path = tmp_path / "tiles.pkt"
+    with TileArchiveWriter(str(path), metadata={"max_zoom": 16}) as w:
+        w.add(16, 33656, 21534, gzip.compress(b'{"parks":[]}'))
+    monkeypatch.setattr(service, "_get_tile_archive", lambda: TileArchive(str(path)))
+    client = TestClient(service.app)
+
+    assert client.get("/tiles/metadata.json").json() == {"max_zoom": 16}
+    r = client.get("/tiles/16/33656/21534")
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json() == {"parks": []}
+    assert client.get("/tiles/16/0/0").status_code == 404
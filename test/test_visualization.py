@@ -0,0 +1,31 @@
+import numpy as np
+from park_accessibility.NA_park_accessibility.NA_visualization import (
+    compact_point_data,
+    distance_classes,
+)
+
+
+def test_distance_classes():
+    dist = [0, 500, 501, 1000, 1400, np.nan, 100]
+    accessible = [True, True, True, True, True, False, False]
+    assert distance_classes(dist, accessible).tolist() == [0, 0, 1, 1, 2, 3, 3]
+
+
+def test_compact_point_data_roundtrip():
+    lat = [52.37, 52.30001, 52.35]
+    lon = [4.89, 4.90002, 4.80]
+    data = compact_point_data(lat, lon, [0, 1, 2], ["a", "b", "c"])
+
+    lats = (data["lat0"] + np.cumsum(data["dlat"])) / data["scale"]
+    lons = (data["lon0"] + np.array(data["lon"])) / data["scale"]
+
+    order = np.argsort(lat)
+    assert np.allclose(lats, np.array(lat)[order])
+    assert np.allclose(lons, np.array(lon)[order])
+    assert data["cls"] == np.array([0, 1, 2])[order].tolist()
+
+
+def test_compact_point_data_non_finite_values():
+    data = compact_point_data([52.3, 52.4, 52.5], [4.9, 4.9, 4.9], [0, 3, 0], ["a", "b", "c", "d"],
+                              values=[120.4, np.nan, np.inf])
+    assert data["values"] == [120, None, None]